@@ -0,0 +1,39 @@
+"""Add composite indexes for daily study plan lookups
+
+Revision ID: 2025120100
+Revises: 0a66f0527ed1
+Create Date: 2025-12-01 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025120100'
+down_revision = '0a66f0527ed1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # get_plans / get_plan_by_date / get_today_plan: user_id + plan_date range, ordered by plan_date
+    op.create_index(
+        'idx_daily_study_plans_user_date',
+        'daily_study_plans',
+        ['user_id', 'plan_date'],
+        postgresql_using='btree'
+    )
+
+    # Status-filtered plan lists and adherence stats
+    op.create_index(
+        'idx_daily_study_plans_user_status',
+        'daily_study_plans',
+        ['user_id', 'status'],
+        postgresql_using='btree'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_daily_study_plans_user_status', table_name='daily_study_plans')
+    op.drop_index('idx_daily_study_plans_user_date', table_name='daily_study_plans')
@@ -0,0 +1,30 @@
+"""Add partial index for active learning goals
+
+Revision ID: 2025120101
+Revises: 2025120100
+Create Date: 2025-12-01 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025120101'
+down_revision = '2025120100'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # complete_plan / plan generation: WHERE user_id = ? AND status = 'active'
+    op.create_index(
+        'idx_learning_goals_user_active',
+        'learning_goals',
+        ['user_id'],
+        postgresql_where=sa.text("status = 'active'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_learning_goals_user_active', table_name='learning_goals')
@@ -0,0 +1,30 @@
+"""Add partial index for mastered flashcards
+
+Revision ID: 2025120102
+Revises: 2025120101
+Create Date: 2025-12-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025120102'
+down_revision = '2025120101'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Mastered-word count: WHERE owner_id = ? AND ease_factor >= 2.0 AND repetitions >= 2
+    op.create_index(
+        'idx_flashcards_owner_mastered',
+        'flashcards',
+        ['owner_id'],
+        postgresql_where=sa.text("ease_factor >= 2.0 AND repetitions >= 2")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_flashcards_owner_mastered', table_name='flashcards')
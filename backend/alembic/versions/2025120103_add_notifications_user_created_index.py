@@ -0,0 +1,29 @@
+"""Add composite index for the notification feed
+
+Revision ID: 2025120103
+Revises: 2025120102
+Create Date: 2025-12-01 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025120103'
+down_revision = '2025120102'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # get_notifications: WHERE user_id = ? ORDER BY created_at DESC
+    op.create_index(
+        'idx_notifications_user_created',
+        'notifications',
+        ['user_id', sa.text('created_at DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_notifications_user_created', table_name='notifications')
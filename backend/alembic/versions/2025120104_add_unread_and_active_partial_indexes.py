@@ -0,0 +1,45 @@
+"""Add partial indexes for unread notifications and active recommendations
+
+Revision ID: 2025120104
+Revises: 2025120103
+Create Date: 2025-12-01 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025120104'
+down_revision = '2025120103'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # mark_all_as_read: WHERE user_id = ? AND is_read = false
+    op.create_index(
+        'idx_notifications_user_unread',
+        'notifications',
+        ['user_id'],
+        postgresql_where=sa.text("is_read = false")
+    )
+
+    # Active recommendations: WHERE user_id = ? AND is_dismissed = 0 AND is_accepted = 0
+    # ORDER BY priority DESC, relevance_score DESC, created_at DESC
+    op.create_index(
+        'idx_adaptive_recommendations_user_active',
+        'adaptive_recommendations',
+        [
+            'user_id',
+            sa.text('priority DESC'),
+            sa.text('relevance_score DESC'),
+            sa.text('created_at DESC'),
+        ],
+        postgresql_where=sa.text("is_dismissed = 0 AND is_accepted = 0")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_adaptive_recommendations_user_active', table_name='adaptive_recommendations')
+    op.drop_index('idx_notifications_user_unread', table_name='notifications')
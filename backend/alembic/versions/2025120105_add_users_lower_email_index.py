@@ -0,0 +1,54 @@
+"""Replace the plain users.email index with a unique LOWER(email) index
+
+Revision ID: 2025120105
+Revises: 2025120104
+Create Date: 2025-12-01 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025120105'
+down_revision = '2025120104'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Accounts whose emails differ only by case cannot both survive lowercasing;
+    # refuse to migrate until they are merged or renamed by hand
+    conn = op.get_bind()
+    duplicates = conn.execute(sa.text(
+        "SELECT lower(email) AS email, array_agg(id ORDER BY id) AS user_ids "
+        "FROM users GROUP BY lower(email) HAVING count(*) > 1 ORDER BY 1"
+    )).fetchall()
+    if duplicates:
+        details = "; ".join(f"{row.email}: user ids {list(row.user_ids)}" for row in duplicates)
+        raise RuntimeError(
+            "Cannot add idx_users_lower_email: these accounts share an email that "
+            f"differs only by case ({details}). Merge or rename them, then re-run the upgrade."
+        )
+
+    # Emails are stored lowercased from now on; normalise existing rows first
+    op.execute("UPDATE users SET email = lower(email) WHERE email <> lower(email)")
+    op.execute(
+        "UPDATE users SET oauth_email = lower(oauth_email) "
+        "WHERE oauth_email IS NOT NULL AND oauth_email <> lower(oauth_email)"
+    )
+
+    # get_by_email / OAuth linking: WHERE lower(email) = ?
+    op.create_index(
+        'idx_users_lower_email',
+        'users',
+        [sa.text('lower(email)')],
+        unique=True
+    )
+    # Superseded by idx_users_lower_email
+    op.drop_index('ix_users_email', table_name='users')
+
+
+def downgrade() -> None:
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.drop_index('idx_users_lower_email', table_name='users')
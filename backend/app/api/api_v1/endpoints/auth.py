@@ -18,13 +18,14 @@ from urllib.parse import quote
 from urllib.parse import urlencode
 import httpx
 from fastapi import Response
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, Query
 from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from app.core.email import send_email
+from app.core.email import send_email_async
 from app.core import security
 from app.core.config import settings
 from app.core.database import get_db
@@ -213,7 +214,11 @@ def logout(request: Request, response: Response) -> Any:
 class ForgotPasswordRequest(BaseModel):
     email: EmailStr
 @router.post("/forgot-password")
-def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db)) -> Any:
+def forgot_password(
+    request: ForgotPasswordRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+) -> Any:
     email = request.email
     user_obj = crud_user.get_by_email(db, email=email)
     if not user_obj:
@@ -226,10 +231,8 @@ def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db
     subject = "Password Reset Request"
     body = f"Hello {user_obj.username},\n\nClick the link below to reset your password:\n{reset_link}\n\nThis link expires in 1 hour."
 
-    try:
-        send_email(subject, user_obj.email, body)
-    except Exception:
-        raise HTTPException(status_code=500, detail="Failed to send reset email")
+    # Sent after the response; delivery failures are logged by send_email_async
+    background_tasks.add_task(send_email_async, subject, user_obj.email, body)
 
     return {"message": "Password reset email sent"}
 
@@ -271,6 +274,25 @@ async def oauth_login(provider: str) -> Any:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error initiating OAuth: {str(e)}")
 
 
+def _finish_oauth_login(oauth_service, user_info: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Blocking part of the OAuth callback: find/create the user, stamp
+    last_login and issue the JWT. Kept off the event loop, and done in the
+    service's own session, which is the one that loaded the user.
+    """
+    try:
+        user_obj, _created = oauth_service.find_or_create_user(user_info)
+        try:
+            user_obj.last_login = datetime.utcnow()
+            oauth_service.db.commit()
+            crud_user.invalidate_cache(user_obj.id)
+        except Exception:
+            oauth_service.db.rollback()
+        return oauth_service.create_jwt_token(user_obj)
+    finally:
+        oauth_service.close()
+
+
 @router.get("/oauth/{provider}/callback")
 async def oauth_callback(
     provider: str,
@@ -278,7 +300,6 @@ async def oauth_callback(
     state: Optional[str] = None,
     error: Optional[str] = None,
     error_description: Optional[str] = None,
-    db: Session = Depends(get_db)
 ) -> Any:
     if provider not in OAUTH_PROVIDERS:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported OAuth provider")
@@ -306,22 +327,9 @@ async def oauth_callback(
         if not access_token:
             raise Exception(f"No access_token in token response: {token_data}")
 
-        # Get user info and create/find user
+        # Get user info, then create/find user and issue the JWT on the threadpool
         user_info = await oauth_service.get_user_info(access_token)
-        user_obj, created = oauth_service.find_or_create_user(user_info)
-
-        # Create backend JWT
-        jwt_token = oauth_service.create_jwt_token(user_obj)
-
-        # Update last_login
-        try:
-            user_obj.last_login = datetime.utcnow()
-            db.add(user_obj)
-            db.commit()
-        except Exception:
-            db.rollback()
-
-        oauth_service.close()
+        jwt_token = await run_in_threadpool(_finish_oauth_login, oauth_service, user_info)
 
         # Build RedirectResponse and set cookie (delete existing first)
         # Redirect to frontend OAuth callback handler, which will then redirect to dashboard
@@ -17,14 +17,18 @@ logger = logging.getLogger(__name__)
 
 def _calculate_user_streak(db: Session, user_id: int, max_days: int = 30) -> int:
     """Count consecutive days (up to max_days) where the user has an active/complete plan."""
+    today = date.today()
+    active_dates = crud_daily_plan.get_active_plan_dates(
+        db,
+        user_id,
+        start_date=today - timedelta(days=max_days - 1),
+        end_date=today
+    )
     streak = 0
-    for offset in range(max_days):
-        check_date = date.today() - timedelta(days=offset)
-        plan = crud_daily_plan.get_plan_by_date(db, user_id, check_date)
-        if plan and plan.status in ('completed', 'in_progress'):
-            streak += 1
-        else:
+    for plan_date in active_dates:
+        if plan_date != today - timedelta(days=streak):
             break
+        streak += 1
     return streak
 
 
@@ -32,13 +36,12 @@ def _calculate_weekly_minutes(db: Session, user_id: int) -> int:
     """Sum actual study minutes for the current calendar week."""
     today = date.today()
     start_of_week = today - timedelta(days=today.weekday())
-    plans = crud_daily_plan.get_plans(
+    return crud_daily_plan.get_minutes_spent(
         db,
         user_id,
         start_date=start_of_week,
         end_date=today
     )
-    return sum((plan.actual_minutes_spent or 0) for plan in plans)
 
 
 def _get_goals_progress(db: Session, user_id: int, limit: int = 3) -> List[Dict[str, Any]]:
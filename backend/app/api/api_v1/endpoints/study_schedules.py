@@ -183,6 +183,7 @@ def get_schedule_plans(
     current_user: User = Depends(deps.get_current_user),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    limit: int = Query(366, ge=1, le=1000, description="Maximum number of plans"),
 ):
     """
     Get all daily plans for a schedule
@@ -200,7 +201,7 @@ def get_schedule_plans(
     
     plans = crud_study_schedule.get_schedule_plans(
         db, schedule_id=schedule_id, user_id=current_user.id,
-        start_date=start_date, end_date=end_date
+        start_date=start_date, end_date=end_date, limit=limit
     )
     return plans
 
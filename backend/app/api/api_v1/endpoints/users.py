@@ -1,7 +1,9 @@
 from typing import Any, List
+from collections import defaultdict
 from datetime import datetime, date, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, and_, cast, Date
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import func, extract, and_, cast, Date, literal, select, union
+import asyncio
 import shutil
 import os
 import re
@@ -16,10 +18,10 @@ from fastapi import (
     Body,
     Query,
 )
+from fastapi.concurrency import run_in_threadpool
 
-from app.core.database import get_db
+from app.core.database import get_db, get_session_factory
 from app.core import deps
-from app.core.security import pwd_context
 from app.crud import user as crud_user
 from app.models.user import User as UserModel
 from app.schemas.user import (
@@ -126,9 +128,13 @@ def setup_learning_preferences(
     current_user.daily_study_time = setup.daily_study_time
 
     db.add(current_user)
+    db.flush()
+    # Build the response before commit expires the instance, so no
+    # follow-up SELECT is needed to re-read values we just assigned.
+    user_out = _user_to_user_out(current_user)
     db.commit()
-    db.refresh(current_user)
-    return _user_to_user_out(current_user)
+    crud_user.invalidate_cache(current_user.id)
+    return user_out
 
 
 
@@ -168,10 +174,9 @@ def upload_avatar(
     avatar_url = f"http://localhost:8000/static/avatars/{filename}"
     current_user.oauth_avatar = avatar_url
     db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    db.flush()
 
-    return {
+    response = {
         "id": current_user.id,
         "email": current_user.email,
         "username": current_user.username,
@@ -183,6 +188,9 @@ def upload_avatar(
         "daily_study_time": current_user.daily_study_time,
         "created_at": current_user.created_at,
     }
+    db.commit()
+    crud_user.invalidate_cache(current_user.id)
+    return response
 
 
 
@@ -240,20 +248,24 @@ def get_user_stats(
     avg_accuracy = float(avg_accuracy_result) if avg_accuracy_result else 0.0
 
     # Total study time (sum of time_taken from quiz attempts + estimated flashcard time)
-    total_quiz_time = db.query(func.sum(QuizAttempt.time_taken)).filter(
+    total_quiz_time = select(func.coalesce(func.sum(QuizAttempt.time_taken), 0)).where(
         QuizAttempt.user_id == current_user.id,
         QuizAttempt.completed_at >= start_date,
         QuizAttempt.is_completed == True
-    ).scalar() or 0
+    ).scalar_subquery()
 
     # Estimate flashcard review time (30 seconds per review)
     # Count total number of reviews, not just number of flashcards
-    flashcard_reviews = db.query(func.sum(Flashcard.times_reviewed)).filter(
+    flashcard_reviews_total = select(func.coalesce(func.sum(Flashcard.times_reviewed), 0)).where(
         Flashcard.owner_id == current_user.id,
         Flashcard.updated_at >= start_date
-    ).scalar() or 0
+    ).scalar_subquery()
 
-    total_study_time = (total_quiz_time + (flashcard_reviews * 30)) // 60  # Convert to minutes
+    # Seconds are summed and converted to minutes server-side in one round-trip
+    flashcard_reviews, total_study_time = db.query(
+        flashcard_reviews_total,
+        (total_quiz_time + flashcard_reviews_total * 30) // 60,
+    ).one()
 
     # Total quizzes completed
     total_quizzes = db.query(func.count(QuizAttempt.id)).filter(
@@ -322,25 +334,18 @@ def get_activity_heatmap(
     ).group_by(cast(Document.created_at, Date)).all()
 
     # Combine all activities by date
-    activity_map = {}
-
+    activity_map = defaultdict(int)
     for activity in quiz_activities + flashcard_activities + document_activities:
-        date_str = activity.date.isoformat()
-        if date_str not in activity_map:
-            activity_map[date_str] = 0
-        activity_map[date_str] += activity[1]  # Add the count
+        activity_map[activity.date] += activity[1]  # Add the count
 
-    # Convert to response format
-    result = []
-    for date_str, count in activity_map.items():
-        result.append(ActivityHeatmapPoint(
-            date=date_str,  # Return as string to match frontend expectation
-            count=min(count, 10)  # Cap at 10 for better visualization
-        ))
-
-    # Sort by date
-    result.sort(key=lambda x: x.date)
-    return result
+    # Convert to response format, sorted by date; values are already valid
+    return [
+        ActivityHeatmapPoint.model_construct(
+            date=day.isoformat(),  # Return as string to match frontend expectation
+            count=min(count, 10),  # Cap at 10 for better visualization
+        )
+        for day, count in sorted(activity_map.items())
+    ]
 
 
 @router.get("/me/performance-history", response_model=List[PerformanceHistoryPoint])
@@ -511,21 +516,46 @@ def get_recent_activities(
 
 
 @router.get("/me/progress", response_model=ProgressResponse)
-def get_full_progress(
+async def get_full_progress(
     *,
     db: Session = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
     current_user: User = Depends(deps.get_current_user),
     range_days: int = Query(30, description="Number of days to look back", ge=1, le=365)
 ) -> Any:
     """
     Get complete progress data for the dashboard
     """
+    def _run_sections(session: Session, sections):
+        return [section(db=session, current_user=current_user, **kwargs) for section, kwargs in sections]
+
+    def _run_sections_in_new_session(sections):
+        with session_factory() as session:
+            return _run_sections(session, sections)
+
+    # The sections are independent reads, split across two sessions (sessions are
+    # not thread-safe) that run concurrently in the threadpool. The request's own
+    # session takes one half, so a call holds at most two pooled connections.
+    (stats, recent_activities), (activity_heatmap, performance_history, skill_breakdown) = (
+        await asyncio.gather(
+            run_in_threadpool(_run_sections, db, [
+                (get_user_stats, {"range_days": range_days}),
+                (get_recent_activities, {"limit": 10}),
+            ]),
+            run_in_threadpool(_run_sections_in_new_session, [
+                (get_activity_heatmap, {"range_days": range_days}),
+                (get_performance_history, {"range_days": range_days}),
+                (get_skill_breakdown, {"range_days": range_days}),
+            ]),
+        )
+    )
+
     return ProgressResponse(
-        stats=get_user_stats(db=db, current_user=current_user, range_days=range_days),
-        activity_heatmap=get_activity_heatmap(db=db, current_user=current_user, range_days=range_days),
-        performance_history=get_performance_history(db=db, current_user=current_user, range_days=range_days),
-        skill_breakdown=get_skill_breakdown(db=db, current_user=current_user, range_days=range_days),
-        recent_activities=get_recent_activities(db=db, current_user=current_user, limit=10)
+        stats=stats,
+        activity_heatmap=activity_heatmap,
+        performance_history=performance_history,
+        skill_breakdown=skill_breakdown,
+        recent_activities=recent_activities,
     )
 
 
@@ -537,43 +567,40 @@ def _calculate_study_streak(db: Session, user_id: int, since_date: datetime) ->
     """
     from app.models import QuizAttempt, Flashcard, Document
 
-    # Get all activity dates since the start date
-    quiz_dates = db.query(cast(QuizAttempt.started_at, Date)).filter(
-        QuizAttempt.user_id == user_id,
-        QuizAttempt.started_at >= since_date
-    ).distinct().all()
-
-    flashcard_dates = db.query(cast(Flashcard.updated_at, Date)).filter(
-        Flashcard.owner_id == user_id,
-        Flashcard.updated_at >= since_date
-    ).distinct().all()
-
-    document_dates = db.query(cast(Document.created_at, Date)).filter(
-        Document.owner_id == user_id,
-        Document.created_at >= since_date
-    ).distinct().all()
-
-    # Combine all unique dates
-    activity_dates = set()
-    for date_tuple in quiz_dates + flashcard_dates + document_dates:
-        activity_dates.add(date_tuple[0])
-
-    if not activity_dates:
-        return 0
-
-    # Sort dates and calculate streak
-    sorted_dates = sorted(activity_dates, reverse=True)
-    streak = 0
-    current_date = date.today()
-
-    for activity_date in sorted_dates:
-        expected_date = current_date - timedelta(days=streak)
-        if activity_date == expected_date:
-            streak += 1
-        else:
-            break
-
-    return streak
+    today = date.today()
+
+    # Distinct activity days across all sources (UNION removes duplicates)
+    activity_days = union(
+        select(cast(QuizAttempt.started_at, Date).label("day")).where(
+            QuizAttempt.user_id == user_id,
+            QuizAttempt.started_at >= since_date,
+        ),
+        select(cast(Flashcard.updated_at, Date).label("day")).where(
+            Flashcard.owner_id == user_id,
+            Flashcard.updated_at >= since_date,
+        ),
+        select(cast(Document.created_at, Date).label("day")).where(
+            Document.owner_id == user_id,
+            Document.created_at >= since_date,
+        ),
+    ).subquery()
+
+    # Walking back from today, the n-th most recent active day is exactly
+    # n days old only while the run is unbroken; after the first gap the
+    # offset stays ahead of the row number, so the matches are the streak.
+    ranked_days = (
+        select(
+            (literal(today, Date) - activity_days.c.day).label("days_ago"),
+            (func.row_number().over(order_by=activity_days.c.day.desc()) - 1).label("rank"),
+        )
+        .where(activity_days.c.day <= today)
+        .subquery()
+    )
+
+    streak = db.execute(
+        select(func.count()).where(ranked_days.c.days_ago == ranked_days.c.rank)
+    ).scalar()
+    return streak or 0
 
 
 def _format_time_ago(time_diff: timedelta) -> str:
@@ -1,25 +1,46 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
+from app.core.config import get_settings
 
+settings = get_settings()
 
-# 1. Tạo Engine
-def create_engine_with_settings():
-    engine_settings = {
-        "pool_size": 20,
-        "max_overflow": 30,
-        "pool_pre_ping": True,
-        "pool_recycle": 3600,
-        "echo": False,
-    }
-    return create_engine(settings.DATABASE_URL, **engine_settings)
 
+# 1. Tạo Engine
+_ENGINE_KWARGS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    # SELECT 1 on checkout, so a connection the server dropped while idle
+    # (restart, failover, admin kill) is replaced instead of failing a request
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    # LIFO hands out the most recently used connection, keeping a warm
+    # core set and letting surplus connections age out via recycle
+    "pool_use_lifo": True,
+    # Rows per statement when executemany-style INSERTs are batched into
+    # one multi-VALUES statement (quiz questions, other executemany INSERTs)
+    "insertmanyvalues_page_size": settings.DB_INSERTMANYVALUES_PAGE_SIZE,
+    # TCP keepalives so idle pooled connections survive NAT/LB timeouts;
+    # they do not detect a dropped connection, pre-ping does that
+    "connect_args": {
+        "keepalives": 1,
+        "keepalives_idle": 30,
+        "keepalives_interval": 10,
+    },
+    "echo": False,
+}
+
+engine = create_engine(settings.DATABASE_URL, **_ENGINE_KWARGS)
 
-engine = create_engine_with_settings()
 
 # 2. Tạo Session
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Keep committed state loaded: objects returned by CRUD mutators are serialized
+# straight from the values just written instead of re-SELECTed after commit.
+# Server-side INSERT defaults still come back through RETURNING at flush time.
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 # 3. Tạo Base (Các model sẽ kế thừa từ đây)
 Base = declarative_base()
@@ -32,3 +53,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_session_factory() -> sessionmaker:
+    """Session factory for endpoints that need a second session (overridable like get_db)"""
+    return SessionLocal
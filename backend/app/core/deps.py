@@ -1,3 +1,4 @@
+import logging
 from typing import Optional
 from fastapi import Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
@@ -7,6 +8,8 @@ from app.core.security import verify_token
 from app.models.user import User
 from app.crud.crud_user import user
 
+logger = logging.getLogger(__name__)
+
 
 def get_current_user(
     request: Request,
@@ -36,26 +39,17 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # 3. Verify token is valid
-    try:
-        user_id = verify_token(token)
-    except Exception as e:
-        print(f"❌ Token verification failed: {e}")
+    # 3. Verify token is valid (verify_token returns None rather than raising)
+    subject = verify_token(token)
+    if not subject or not subject.isdigit():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token invalid or expired",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
     # 4. Get user from DB
-    current_user = user.get(db, id=int(user_id))
+    current_user = user.get_cached(db, id=int(subject))
     if not current_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -68,17 +62,13 @@ def get_current_user(
             detail="Inactive user",
         )
 
-    print(f"✅ Authenticated user: {current_user.email} (ID={current_user.id})")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Authenticated user: %s (ID=%s)", current_user.email, current_user.id)
     return current_user
 
 
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
-    """Returns only active users"""
-    if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Inactive user",
-        )
+    """Returns only active users (get_current_user already rejects inactive ones)"""
     return current_user
@@ -1,8 +1,14 @@
+import asyncio
 import smtplib
 from email.message import EmailMessage
-from app.core.config import settings
+from typing import Optional
+
+import aiosmtplib
+from app.core.config import get_settings
 import logging
 
+settings = get_settings()
+
 logger = logging.getLogger(__name__)
 
 
@@ -10,35 +16,77 @@ def send_email(subject: str, to: str, body: str, is_html: bool = False) -> None:
     """
     Gửi email hỗ trợ cả text thường và HTML.
     """
-    # --- MÔI TRƯỜNG DEV/TEST (In ra console) ---
-    # Nếu bạn chưa cấu hình SMTP thật, hãy giữ đoạn này để debug
-    print(f"\n{'='*20} [EMAIL SIMULATION] {'='*20}")
-    print(f"📨 To: {to}")
-    print(f"📌 Subject: {subject}")
-    print(f"📄 Body: {body[:100]}...")  # In ra 100 ký tự đầu
-    print(f"{'='*60}\n")
+    # --- MÔI TRƯỜNG DEV/TEST (Ghi log) ---
+    # Nếu bạn chưa cấu hình SMTP thật, bật DEBUG log để xem nội dung email
+    logger.debug(
+        "[EMAIL SIMULATION] To: %s | Subject: %s | Body: %.100s...", to, subject, body
+    )
 
     # Nếu đang test local mà chưa có SMTP server, hãy return tại đây
     # return
 
     # --- MÔI TRƯỜNG PROD (Gửi thật) ---
     try:
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = settings.SMTP_FROM_EMAIL
-        msg["To"] = to
-
-        if is_html:
-            msg.add_alternative(body, subtype="html")
-        else:
-            msg.set_content(body)
+        msg = _build_message(subject, to, body, is_html)
 
         with smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT) as smtp:
             smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
             smtp.send_message(msg)
 
-        logger.info(f"✅ Email sent to {to}")
+        logger.info("✅ Email sent to %s", to)
 
     except Exception as e:
-        logger.error(f"❌ Failed to send email to {to}: {e}")
+        logger.error("❌ Failed to send email to %s: %s", to, e)
         # Không raise exception để tránh làm chết background task
+
+
+def _build_message(subject: str, to: str, body: str, is_html: bool) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = settings.SMTP_FROM_EMAIL
+    msg["To"] = to
+
+    if is_html:
+        msg.add_alternative(body, subtype="html")
+    else:
+        msg.set_content(body)
+    return msg
+
+
+# Shared SMTP connection for the API process, opened on first use so the
+# TLS handshake and login are paid once rather than per email.
+_smtp: Optional[aiosmtplib.SMTP] = None
+_smtp_lock = asyncio.Lock()
+
+
+async def _get_smtp() -> aiosmtplib.SMTP:
+    global _smtp
+    if _smtp is None or not _smtp.is_connected:
+        _smtp = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST, port=settings.SMTP_PORT, use_tls=True
+        )
+        await _smtp.connect()
+        await _smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+    return _smtp
+
+
+async def send_email_async(subject: str, to: str, body: str, is_html: bool = False) -> None:
+    """
+    Async variant of send_email for API endpoints; schedule it with
+    BackgroundTasks so the response is not held up by SMTP.
+    """
+    global _smtp
+    msg = _build_message(subject, to, body, is_html)
+    try:
+        async with _smtp_lock:
+            try:
+                smtp = await _get_smtp()
+                await smtp.send_message(msg)
+            except aiosmtplib.SMTPServerDisconnected:
+                # The server dropped the idle connection: reconnect once
+                _smtp = None
+                smtp = await _get_smtp()
+                await smtp.send_message(msg)
+        logger.info("Email sent to %s", to)
+    except Exception as e:
+        logger.error("Failed to send email to %s: %s", to, e)
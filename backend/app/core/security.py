@@ -1,34 +1,118 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from datetime import datetime, timedelta
-from typing import Any, Union, Optional
-from jose import jwt, JWTError
+from datetime import timedelta
+from typing import Any, Union, Optional, Tuple
+from collections import OrderedDict
+from jose import jws, jwt
 from app.core.database import get_db
-from app.models.user import User
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 from app.core.config import settings
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+import binascii
+import bcrypt
+import orjson
 import hashlib
+import hmac
+import os
+import threading
+import time
 
-# Password hashing (bcrypt)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing (Argon2id). Older accounts still hold SHA256 + bcrypt
+# ($2b$) hashes; those keep verifying and are re-hashed on the next login.
+_argon2 = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
 
-def _prehash_password(password: str) -> str:
-    """Pre-hash password with SHA256 to avoid bcrypt 72-byte limit"""
+# Hashing is CPU-bound (and releases the GIL), so running more hashes at once
+# than there are cores only slows every one of them down. The slots cap
+# concurrent hashes from any thread (sync routes hash on AnyIO's workers).
+_hash_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
+
+# hashlib's sha256 is OpenSSL's, which already dispatches to SHA-NI at runtime
+_sha256 = hashlib.sha256
+
+def _prehash_password(password: str) -> bytes:
+    """
+    Pre-hash password with SHA256 to avoid bcrypt 72-byte limit.
+    Returns the hex digest as ASCII bytes (the format every stored hash was made with),
+    ready to hand to bcrypt without a str round-trip.
+    """
     if isinstance(password, str):
         password = password.encode("utf-8")
-    return hashlib.sha256(password).hexdigest()
+    return binascii.hexlify(_sha256(password).digest())
+
+def _is_bcrypt_hash(hashed_password: str) -> bool:
+    return hashed_password.startswith("$2")
 
 def get_password_hash(password: str) -> str:
-    """Hash a plain password with SHA256 + bcrypt"""
-    return pwd_context.hash(_prehash_password(password))
+    """Hash a plain password with Argon2id"""
+    with _hash_slots:
+        return _argon2.hash(password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True for legacy bcrypt hashes and Argon2 hashes made with older parameters"""
+    if not hashed_password:
+        return False
+    if _is_bcrypt_hash(hashed_password):
+        return True
+    try:
+        return _argon2.check_needs_rehash(hashed_password)
+    except InvalidHashError:
+        return False
+
+def _check_password(plain_password: str, prehashed: bytes, hashed_password: str) -> bool:
+    with _hash_slots:
+        if _is_bcrypt_hash(hashed_password):
+            return bcrypt.checkpw(prehashed, hashed_password.encode("ascii"))
+        try:
+            return _argon2.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+# Recent verification outcomes, so repeated logins skip hashing for a short
+# while. Keys are HMAC(SECRET_KEY, prehash + stored hash): nothing in the
+# cache reveals a password, and a password change alters the stored hash,
+# which orphans the old entries. Failures are kept briefly too, so a flood
+# of the same wrong password costs one hash check per window.
+PASSWORD_CACHE_TTL = 60
+PASSWORD_FAILURE_CACHE_TTL = 30
+PASSWORD_CACHE_MAXSIZE = 4096
+_password_cache: "OrderedDict[bytes, Tuple[float, bool]]" = OrderedDict()
+_password_cache_lock = threading.Lock()
+# Keyed once; each lookup copies the state instead of re-deriving the pads
+_password_cache_hmac = hmac.new(settings.SECRET_KEY.encode("utf-8"), digestmod=hashlib.sha256)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify plain password against hashed hash"""
-    return pwd_context.verify(_prehash_password(plain_password), hashed_password)
+    if not hashed_password:
+        return False
+    prehashed = _prehash_password(plain_password)
+    mac = _password_cache_hmac.copy()
+    mac.update(prehashed + b":" + hashed_password.encode("ascii"))
+    key = mac.digest()
+    now = time.time()
+    with _password_cache_lock:
+        cached = _password_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    verified = _check_password(plain_password, prehashed, hashed_password)
+
+    ttl = PASSWORD_CACHE_TTL if verified else PASSWORD_FAILURE_CACHE_TTL
+    with _password_cache_lock:
+        _password_cache[key] = (now + ttl, verified)
+        if len(_password_cache) > PASSWORD_CACHE_MAXSIZE:
+            _password_cache.popitem(last=False)
+    return verified
 
 # JWT settings
 ALGORITHM = "HS256"
+# Signing key encoded once; settings are frozen so it cannot change at runtime
+_SIGNING_KEY = settings.SECRET_KEY.encode("utf-8")
+_DEFAULT_TOKEN_LIFETIME = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
 
 def create_access_token(
     subject: Union[str, Any], 
@@ -36,26 +120,59 @@ def create_access_token(
 ) -> str:
     """Create JWT access token"""
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        lifetime = expires_delta.total_seconds()
     else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-    
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+        lifetime = _DEFAULT_TOKEN_LIFETIME
+
+    # Claims are serialized with orjson and signed through jws directly, which
+    # is what jwt.encode does after its datetime conversion and stdlib json pass.
+    # "sub" stays a string: jwt.decode rejects non-string subjects.
+    to_encode = {"exp": int(time.time() + lifetime), "sub": str(subject)}
+    encoded_jwt = jws.sign(orjson.dumps(to_encode), _SIGNING_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Decoded-token cache: a client's request burst reuses one HMAC check.
+# Entries live at most TOKEN_CACHE_TTL seconds and never past the token's exp.
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_MAXSIZE = 10000
+_token_cache: "OrderedDict[bytes, Tuple[float, Optional[str]]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+# Our tokens only carry exp and sub, so skip the checks for claims we never issue
+_DECODE_OPTIONS = {
+    "verify_aud": False,
+    "verify_iat": False,
+    "verify_nbf": False,
+    "verify_iss": False,
+    "verify_jti": False,
+    "verify_at_hash": False,
+    "require_exp": True,
+}
+
 def verify_token(token: str) -> Optional[str]:
     """Verify JWT token and return subject"""
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
     try:
         payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[ALGORITHM]
+            token, _SIGNING_KEY, algorithms=[ALGORITHM], options=_DECODE_OPTIONS
         )
-        return payload.get("sub")
     except jwt.JWTError:
         return None
 
+    subject = payload.get("sub")
+    expires_at = min(now + TOKEN_CACHE_TTL, payload.get("exp") or now)
+    if expires_at > now:
+        with _token_cache_lock:
+            _token_cache[key] = (expires_at, subject)
+            if len(_token_cache) > TOKEN_CACHE_MAXSIZE:
+                _token_cache.popitem(last=False)
+    return subject
+
 # OAuth provider configuration
 OAUTH_PROVIDERS = {
     "google": {
@@ -95,15 +212,15 @@ def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    # verify_token shares the decoded-token cache with app.core.deps
+    user_id = verify_token(token)
+    if user_id is None or not user_id.isdigit():
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    # Imported here: crud_user imports this module for password hashing
+    from app.crud.crud_user import user as crud_user
+
+    user = crud_user.get_cached(db, id=int(user_id))
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    return user
@@ -1,30 +1,126 @@
 from typing import List, Optional
-from datetime import date, datetime
+from pydantic import TypeAdapter
+from datetime import date, datetime, timedelta
 import logging
+import orjson
+from celery import group
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
+from sqlalchemy import desc, event, func, insert, update
 
 # --- SỬA IMPORT QUAN TRỌNG TẠI ĐÂY ---
 from app.models.daily_plan import DailyStudyPlan
-from app.models.study_schedule import StudySchedule
 from app.models.study_session import StudySession
 from app.models.learning_goal import LearningGoal
 
 # -------------------------------------
 
-from app.schemas.daily_plan import DailyStudyPlanCreate, DailyStudyPlanUpdate
+from app.schemas.daily_plan import (
+    DailyStudyPlanCreate,
+    DailyStudyPlanUpdate,
+    RecommendedTask,
+)
+from app.crud.crud_recommendation import crud_recommendation
+from app.tasks.notification_tasks import send_completion_notification
+
+# Optional Redis client — stats are computed from the database without it
+try:
+    from app.core.redis import redis_client  # type: ignore
+except Exception:
+    redis_client = None
 
 logger = logging.getLogger(__name__)
 
+STATS_CACHE_TTL = 300  # seconds
+# Session.info key for completion notifications waiting on the commit
+_PENDING_NOTIFICATIONS = "pending_completion_notifications"
+
+# Dumps the whole task list in one call instead of model_dump() per task
+_TASKS_ADAPTER = TypeAdapter(List[RecommendedTask])
+
+
+def _stats_cache_key(user_id: int) -> str:
+    return f"plan_stats:{user_id}"
+
+
+def _cached_stats(user_id: int, field: str, compute):
+    """
+    Read-through cache for per-user plan aggregates.
+    All of a user's entries live in one Redis hash so a plan write drops them together.
+    """
+    if redis_client is None:
+        return compute()
+
+    key = _stats_cache_key(user_id)
+    # Entries are per day: the windows are relative to date.today()
+    field = f"{field}:{date.today().isoformat()}"
+    try:
+        raw = redis_client.hget(key, field)
+    except Exception as e:
+        logger.warning("Redis hget failed for %s, using database: %s", key, e)
+        return compute()
+    if raw:
+        return orjson.loads(raw)
+
+    value = compute()
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hset(key, field, orjson.dumps(value))
+        pipe.expire(key, STATS_CACHE_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Redis hset failed for %s: %s", key, e)
+    return value
+
+
+def _invalidate_stats_cache(user_id: int) -> None:
+    """Drop cached aggregates after the user's plans have been modified"""
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(_stats_cache_key(user_id))
+    except Exception as e:
+        logger.warning("Redis delete failed for plan stats of user %s: %s", user_id, e)
+
+
+@event.listens_for(Session, "after_commit")
+def _send_pending_notifications(session: Session) -> None:
+    """
+    Publish completion notifications only once the plan rows are committed,
+    so a worker never reads a plan before it is visible.
+    Several completions in one transaction go out as a single group.
+    """
+    pending = session.info.pop(_PENDING_NOTIFICATIONS, None)
+    if not pending:
+        return
+    try:
+        if len(pending) == 1:
+            send_completion_notification.delay(*pending[0])
+        else:
+            group(send_completion_notification.s(*args) for args in pending).apply_async()
+    except Exception as e:
+        logger.warning(f"Failed to trigger completion notification: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_notifications(session: Session) -> None:
+    session.info.pop(_PENDING_NOTIFICATIONS, None)
+
+
+def _get_user_plan(db: Session, plan_id: int, user_id: int) -> Optional[DailyStudyPlan]:
+    """Get a plan by id, scoped to its owner"""
+    # Session.get checks the identity map before issuing a SELECT
+    plan = db.get(DailyStudyPlan, plan_id)
+    if plan is None or plan.user_id != user_id:
+        return None
+    return plan
+
 
 def get_today_plan(db: Session, user_id: int) -> Optional[DailyStudyPlan]:
     """Get today's study plan for a user"""
     today = date.today()
     return (
         db.query(DailyStudyPlan)
-        .filter(
-            and_(DailyStudyPlan.user_id == user_id, DailyStudyPlan.plan_date == today)
-        )
+        .filter_by(user_id=user_id, plan_date=today)
         .first()
     )
 
@@ -35,11 +131,7 @@ def get_plan_by_date(
     """Get plan for a specific date"""
     return (
         db.query(DailyStudyPlan)
-        .filter(
-            and_(
-                DailyStudyPlan.user_id == user_id, DailyStudyPlan.plan_date == plan_date
-            )
-        )
+        .filter_by(user_id=user_id, plan_date=plan_date)
         .first()
     )
 
@@ -68,46 +160,59 @@ def get_plans(
     )
 
 
+def _plan_values(plan: DailyStudyPlanCreate, user_id: int) -> dict:
+    """Column values for a new plan row"""
+    # Convert Pydantic models to plain dicts for the JSON column
+    tasks_data = _TASKS_ADAPTER.dump_python(plan.recommended_tasks, mode="json")
+    return {
+        "user_id": user_id,
+        "schedule_id": plan.schedule_id,
+        "plan_date": plan.plan_date,
+        "plan_summary": plan.plan_summary,
+        "recommended_tasks": tasks_data,
+        "source_recommendation_ids": plan.source_recommendation_ids,
+        "total_estimated_minutes": plan.total_estimated_minutes,
+        "total_tasks_count": len(tasks_data),
+        "priority_level": plan.priority_level,
+        "status": "pending",
+    }
+
+
 def create_plan(
     db: Session, plan: DailyStudyPlanCreate, user_id: int
 ) -> DailyStudyPlan:
     """Create a new daily plan"""
-    # Convert Pydantic models to dict/JSON if necessary
-    tasks_data = [
-        t.model_dump() if hasattr(t, "model_dump") else t
-        for t in plan.recommended_tasks
-    ]
-
-    db_plan = DailyStudyPlan(
-        user_id=user_id,
-        schedule_id=plan.schedule_id,
-        plan_date=plan.plan_date,
-        plan_summary=plan.plan_summary,
-        recommended_tasks=tasks_data,
-        total_estimated_minutes=plan.total_estimated_minutes,
-        total_tasks_count=len(tasks_data),
-        priority_level=plan.priority_level,
-        status="pending",
-    )
+    db_plan = DailyStudyPlan(**_plan_values(plan, user_id))
     db.add(db_plan)
+
+    if plan.source_recommendation_ids:
+        # Flush for the plan id, then mark all source recommendations in one UPDATE
+        db.flush()
+        crud_recommendation.mark_many_included_in_plan(
+            db,
+            recommendation_ids=plan.source_recommendation_ids,
+            user_id=user_id,
+            plan_id=db_plan.id,
+            plan_date=plan.plan_date.isoformat(),
+            commit=False,
+        )
+
     db.commit()
-    db.refresh(db_plan)
+    _invalidate_stats_cache(user_id)
     return db_plan
 
 
 def start_plan(db: Session, plan_id: int, user_id: int) -> Optional[DailyStudyPlan]:
     """Mark plan as in progress"""
-    plan = (
-        db.query(DailyStudyPlan)
-        .filter(and_(DailyStudyPlan.id == plan_id, DailyStudyPlan.user_id == user_id))
-        .first()
-    )
+    plan = _get_user_plan(db, plan_id, user_id)
 
     if plan and plan.status == "pending":
+        now = datetime.utcnow()
         plan.status = "in_progress"
-        plan.started_at = func.now()
+        plan.started_at = now
+        # Set client-side so the onupdate default doesn't expire it on flush
+        plan.updated_at = now
         db.commit()
-        db.refresh(plan)
     return plan
 
 
@@ -122,81 +227,107 @@ def complete_plan(
     user_notes: Optional[str] = None,
 ) -> Optional[DailyStudyPlan]:
     """Mark plan as completed"""
-    plan = (
-        db.query(DailyStudyPlan)
-        .filter(and_(DailyStudyPlan.id == plan_id, DailyStudyPlan.user_id == user_id))
-        .first()
-    )
+    plan = _get_user_plan(db, plan_id, user_id)
 
     if not plan:
         return None
 
-    plan.status = "completed"
-    plan.is_completed = True
-    plan.completed_at = func.now()
-    plan.actual_minutes_spent = actual_minutes_spent
-    plan.completed_tasks_count = completed_tasks_count
-    plan.actual_performance = actual_performance
-
-    if effectiveness_rating:
-        plan.effectiveness_rating = effectiveness_rating
-    if user_notes:
-        plan.user_notes = user_notes
-
-    # Calculate completion percentage
-    if plan.total_tasks_count > 0:
-        plan.completion_percentage = (
-            completed_tasks_count / plan.total_tasks_count
-        ) * 100
-
-    plan.updated_at = datetime.utcnow()
-
-    # ✅ Integration 1: Create StudySession for analytics
-    if plan.started_at:
-        session = StudySession(
-            user_id=user_id,
-            daily_plan_id=plan_id,
-            session_type="mixed",  # Daily plan contains multiple activities
-            duration_seconds=actual_minutes_spent * 60,
-            started_at=plan.started_at,
-            ended_at=datetime.utcnow(),
-            performance_data=actual_performance or {},
-            is_planned=True,
-        )
-        db.add(session)
-
-    # ✅ Integration 2: Update Learning Goal Progress
-    # Get active goals and update their progress based on completed tasks
-    active_goals = (
-        db.query(LearningGoal)
-        .filter(and_(LearningGoal.user_id == user_id, LearningGoal.status == "active"))
-        .all()
-    )
-
-    for goal in active_goals:
-        # Increment progress by completed tasks count
-        if goal.current_progress is None:
-            goal.current_progress = 0
-        goal.current_progress += completed_tasks_count
-
-        # Update goal status if target reached
-        if goal.target_metrics and "tasks_completed" in goal.target_metrics:
-            target = goal.target_metrics["tasks_completed"]
-            if goal.current_progress >= target:
-                goal.status = "completed"
-                goal.current_progress = target
+    # Session, goal progress and plan status are one unit: the owner lookup
+    # above already opened the transaction and a single commit closes it
+    try:
+        # One timestamp for every field this completion touches
+        now = datetime.utcnow()
+
+        plan.status = "completed"
+        plan.is_completed = True
+        plan.completed_at = now
+        plan.actual_minutes_spent = actual_minutes_spent
+        plan.completed_tasks_count = completed_tasks_count
+        plan.actual_performance = actual_performance
+
+        if effectiveness_rating:
+            plan.effectiveness_rating = effectiveness_rating
+        if user_notes:
+            plan.user_notes = user_notes
+
+        # Calculate completion percentage
+        if plan.total_tasks_count > 0:
+            plan.completion_percentage = (
+                completed_tasks_count / plan.total_tasks_count
+            ) * 100
+
+        plan.updated_at = now
+
+        # ✅ Integration 1: Create StudySession for analytics
+        # Nothing reads the session back, so insert it directly instead of
+        # tracking a new object in the unit of work
+        if plan.started_at:
+            db.execute(
+                insert(StudySession).values(
+                    user_id=user_id,
+                    daily_plan_id=plan_id,
+                    session_type="mixed",  # Daily plan contains multiple activities
+                    duration_seconds=actual_minutes_spent * 60,
+                    started_at=plan.started_at,
+                    ended_at=now,
+                    performance_data=actual_performance or {},
+                    is_planned=True,
+                )
+            )
 
-    db.commit()
-    db.refresh(plan)
+        # ✅ Integration 2: Update Learning Goal Progress
+        # Read only the columns the progress update needs and write every goal back
+        # with one ORM bulk UPDATE by primary key instead of a flush per hydrated row
+        # With no completed tasks there is no progress to add, so skip the goal query
+        active_goals = []
+        if completed_tasks_count:
+            active_goals = (
+                db.query(LearningGoal.id, LearningGoal.current_progress, LearningGoal.target_metrics)
+                .filter_by(user_id=user_id, status="active")
+                .all()
+            )
 
-    # 🆕 THÊM: Trigger completion notification (async)
-    try:
-        from app.tasks.notification_tasks import send_completion_notification
+        goal_updates = []
+        for goal_id, current_progress, target_metrics in active_goals:
+            # current_progress is a JSON object ({} for new goals); keep the task counter under its own key
+            progress = dict(current_progress) if isinstance(current_progress, dict) else {
+                "tasks_completed": current_progress or 0
+            }
+            tasks_completed = progress.get("tasks_completed", 0) + completed_tasks_count
+            # Every mapping carries the same keys so the bulk UPDATE stays a single executemany
+            goal_update = {"id": goal_id, "updated_at": now, "status": "active", "completed_at": None}
+
+            # Update goal status if target reached
+            if target_metrics and "tasks_completed" in target_metrics:
+                target = target_metrics["tasks_completed"]
+                if tasks_completed >= target:
+                    tasks_completed = target
+                    goal_update["status"] = "completed"
+                    goal_update["completed_at"] = now
+
+            progress["tasks_completed"] = tasks_completed
+            goal_update["current_progress"] = progress
+            goal_updates.append(goal_update)
+
+        if goal_updates:
+            # Only goals still active are written, so a goal completed concurrently
+            # (e.g. by process_learning_event_task) after the read above stays completed.
+            # The goals were read as columns, so there are no loaded objects to synchronize.
+            db.execute(
+                update(LearningGoal)
+                .where(LearningGoal.status == "active")
+                .execution_options(synchronize_session=None),
+                goal_updates,
+            )
 
-        send_completion_notification.delay(user_id, plan_id)
-    except Exception as e:
-        logger.warning(f"Failed to trigger completion notification: {e}")
+        # 🆕 THÊM: Trigger completion notification (async, sent on commit)
+        db.info.setdefault(_PENDING_NOTIFICATIONS, []).append((user_id, plan_id))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
 
+    _invalidate_stats_cache(user_id)
     return plan
 
 
@@ -204,26 +335,151 @@ def skip_plan(
     db: Session, plan_id: int, user_id: int, skip_reason: str
 ) -> Optional[DailyStudyPlan]:
     """Mark plan as skipped"""
-    plan = (
-        db.query(DailyStudyPlan)
-        .filter(and_(DailyStudyPlan.id == plan_id, DailyStudyPlan.user_id == user_id))
-        .first()
-    )
+    plan = _get_user_plan(db, plan_id, user_id)
 
     if not plan:
         return None
 
     plan.status = "skipped"
     plan.skip_reason = skip_reason
+    plan.updated_at = datetime.utcnow()
     db.commit()
-    db.refresh(plan)
+    _invalidate_stats_cache(user_id)
     return plan
 
 
+def update_plan(
+    db: Session, plan_id: int, user_id: int, plan_update: DailyStudyPlanUpdate
+) -> Optional[DailyStudyPlan]:
+    """Update plan progress"""
+    plan = _get_user_plan(db, plan_id, user_id)
+
+    if not plan:
+        return None
+
+    now = datetime.utcnow()
+    update_data = plan_update.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(plan, field, value)
+
+    if "completed_tasks_count" in update_data and plan.total_tasks_count > 0:
+        plan.completion_percentage = (
+            plan.completed_tasks_count / plan.total_tasks_count
+        ) * 100
+    if update_data.get("status") == "completed" and not plan.is_completed:
+        plan.is_completed = True
+        plan.completed_at = now
+    plan.updated_at = now
+
+    db.commit()
+    _invalidate_stats_cache(user_id)
+    return plan
+
+
+def delete_plan(db: Session, plan_id: int, user_id: int) -> bool:
+    """Delete a plan"""
+    plan = _get_user_plan(db, plan_id, user_id)
+
+    if not plan:
+        return False
+
+    db.delete(plan)
+    db.commit()
+    _invalidate_stats_cache(user_id)
+    return True
+
+
 def get_completion_rate(db: Session, user_id: int, days: int = 7) -> float:
     """Calculate completion rate for past N days"""
-    # ... implementation details ...
-    return 0.0  # Placeholder logic
+    return _cached_stats(
+        user_id, f"completion_rate:{days}", lambda: _compute_completion_rate(db, user_id, days)
+    )
+
+
+def _compute_completion_rate(db: Session, user_id: int, days: int) -> float:
+    start_date = date.today() - timedelta(days=days)
+    total, completed = (
+        db.query(
+            func.count(DailyStudyPlan.id),
+            func.count(DailyStudyPlan.id).filter(DailyStudyPlan.status == "completed"),
+        )
+        .filter(DailyStudyPlan.user_id == user_id, DailyStudyPlan.plan_date >= start_date)
+        .one()
+    )
+    return round(completed / total * 100, 2) if total else 0.0
+
+
+def get_active_plan_dates(
+    db: Session, user_id: int, start_date: date, end_date: date
+) -> List[date]:
+    """Dates in a range whose plan is completed or in progress, newest first (no row hydration)"""
+    rows = (
+        db.query(DailyStudyPlan.plan_date)
+        .filter(
+            DailyStudyPlan.user_id == user_id,
+            DailyStudyPlan.plan_date >= start_date,
+            DailyStudyPlan.plan_date <= end_date,
+            DailyStudyPlan.status.in_(("completed", "in_progress")),
+        )
+        .distinct()
+        .order_by(desc(DailyStudyPlan.plan_date))
+        .all()
+    )
+    return [plan_date for (plan_date,) in rows]
+
+
+def get_minutes_spent(
+    db: Session, user_id: int, start_date: date, end_date: Optional[date] = None
+) -> int:
+    """Sum actual study minutes over a date range in SQL"""
+    query = db.query(
+        func.coalesce(func.sum(DailyStudyPlan.actual_minutes_spent), 0)
+    ).filter(DailyStudyPlan.user_id == user_id, DailyStudyPlan.plan_date >= start_date)
+    if end_date:
+        query = query.filter(DailyStudyPlan.plan_date <= end_date)
+    return int(query.scalar())
+
+
+def get_adherence_stats(db: Session, user_id: int, days: int = 30) -> dict:
+    """Aggregate plan adherence for past N days in a single GROUP BY query"""
+    return _cached_stats(
+        user_id, f"adherence:{days}", lambda: _compute_adherence_stats(db, user_id, days)
+    )
+
+
+def _compute_adherence_stats(db: Session, user_id: int, days: int) -> dict:
+    start_date = date.today() - timedelta(days=days)
+    rows = (
+        db.query(
+            DailyStudyPlan.status,
+            func.count(DailyStudyPlan.id),
+            func.coalesce(func.sum(DailyStudyPlan.actual_minutes_spent), 0),
+            func.coalesce(func.sum(DailyStudyPlan.completion_percentage), 0),
+        )
+        .filter(DailyStudyPlan.user_id == user_id, DailyStudyPlan.plan_date >= start_date)
+        .group_by(DailyStudyPlan.status)
+        .all()
+    )
 
+    counts = {}
+    total_plans = 0
+    total_minutes = 0
+    total_percentage = 0.0
+    for status, count, minutes, percentage in rows:
+        counts[status] = count
+        total_plans += count
+        total_minutes += int(minutes)
+        total_percentage += float(percentage)
+
+    completed = counts.get("completed", 0)
+    return {
+        "total_plans": total_plans,
+        "completed": completed,
+        "skipped": counts.get("skipped", 0),
+        "pending": counts.get("pending", 0) + counts.get("in_progress", 0),
+        "completion_rate": round(completed / total_plans * 100, 2) if total_plans else 0.0,
+        "avg_completion_percentage": round(total_percentage / total_plans, 2) if total_plans else 0.0,
+        "total_study_minutes": total_minutes,
+        "avg_daily_minutes": round(total_minutes / days, 2) if days > 0 else 0.0,
+    }
 
-### Bước cuối cùng: Restart Backend
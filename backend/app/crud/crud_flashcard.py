@@ -31,6 +31,8 @@ class CRUDFlashcard(CRUDBase[Flashcard, FlashcardCreate, FlashcardUpdate]):
                 Flashcard.owner_id == user_id,
                 Flashcard.next_review_date <= now
             )
+            # Most overdue first; walks idx_flashcards_next_review and stops at limit
+            .order_by(Flashcard.next_review_date.asc())
             .limit(limit)
             .all()
         )
@@ -53,7 +55,6 @@ class CRUDFlashcard(CRUDBase[Flashcard, FlashcardCreate, FlashcardUpdate]):
         db_obj = self.model(**obj_in_data, owner_id=owner_id, next_review_date=datetime.utcnow())
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
     
 flashcard = CRUDFlashcard(Flashcard)
@@ -1,7 +1,7 @@
 from typing import List, Optional
 from datetime import date, datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func
 
 from app.models.learning_goal import LearningGoal
 from app.schemas.learning_goal import LearningGoalCreate, LearningGoalUpdate
@@ -55,7 +55,6 @@ def create_goal(db: Session, goal: LearningGoalCreate, user_id: int) -> Learning
     )
     db.add(db_goal)
     db.commit()
-    db.refresh(db_goal)
     return db_goal
 
 
@@ -76,7 +75,6 @@ def update_goal(
     
     db_goal.updated_at = datetime.utcnow()
     db.commit()
-    db.refresh(db_goal)
     return db_goal
 
 
@@ -92,27 +90,28 @@ def update_goal_progress(
     if not db_goal:
         return None
     
+    today = date.today()
+    now = datetime.utcnow()
     db_goal.current_progress = current_progress
     db_goal.completion_percentage = completion_percentage
     
     # Check if on track
-    today = date.today()
     total_days = (db_goal.target_date - db_goal.start_date).days
     days_passed = (today - db_goal.start_date).days
-    expected_progress = (days_passed / total_days * 100) if total_days > 0 else 0
+    expected_progress = (days_passed * 100.0 / total_days) if total_days > 0 else 0.0
     
     db_goal.is_on_track = completion_percentage >= (expected_progress - 10)  # 10% tolerance
-    db_goal.days_behind = max(0, int((expected_progress - completion_percentage) / (100 / total_days)))
+    # Percentage points behind, scaled back to days (one multiply, no second division)
+    db_goal.days_behind = max(0, int((expected_progress - completion_percentage) * total_days / 100)) if total_days > 0 else 0
     
     # Auto-complete if 100%
     if completion_percentage >= 100 and db_goal.status == 'active':
         db_goal.status = 'completed'
-        db_goal.completed_at = datetime.utcnow()
+        db_goal.completed_at = now
         db_goal.actual_completion_date = today
     
-    db_goal.updated_at = datetime.utcnow()
+    db_goal.updated_at = now
     db.commit()
-    db.refresh(db_goal)
     return db_goal
 
 
@@ -129,14 +128,20 @@ def delete_goal(db: Session, goal_id: int, user_id: int) -> bool:
 
 def get_goals_summary(db: Session, user_id: int) -> dict:
     """Get summary of user's goals"""
-    goals = get_goals(db, user_id)
+    rows = db.query(
+        LearningGoal.status,
+        LearningGoal.is_on_track,
+        func.count(LearningGoal.id)
+    ).filter(
+        LearningGoal.user_id == user_id
+    ).group_by(LearningGoal.status, LearningGoal.is_on_track).all()
     
-    return {
-        "total": len(goals),
-        "active": len([g for g in goals if g.status == 'active']),
-        "completed": len([g for g in goals if g.status == 'completed']),
-        "paused": len([g for g in goals if g.status == 'paused']),
-        "on_track": len([g for g in goals if g.is_on_track and g.status == 'active']),
-        "behind": len([g for g in goals if not g.is_on_track and g.status == 'active']),
-    }
-
+    summary = {"total": 0, "active": 0, "completed": 0, "paused": 0, "on_track": 0, "behind": 0}
+    for status, is_on_track, count in rows:
+        summary["total"] += count
+        if status in ('active', 'completed', 'paused'):
+            summary[status] += count
+        if status == 'active':
+            summary["on_track" if is_on_track else "behind"] += count
+    
+    return summary
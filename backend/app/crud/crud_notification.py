@@ -1,4 +1,5 @@
 # app/crud/crud_notification.py
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from app.models.notification import Notification
 from app.schemas.notification import NotificationCreate
@@ -15,11 +16,14 @@ def get_notifications(db: Session, user_id: int):
 
 
 def mark_as_read(db: Session, notification_id: int):
-    notif = db.query(Notification).filter(Notification.id == notification_id).first()
-    if notif:
-        notif.is_read = True
-        db.commit()
-        db.refresh(notif)
+    # One UPDATE ... RETURNING instead of SELECT, flush and commit
+    notif = db.execute(
+        update(Notification)
+        .where(Notification.id == notification_id)
+        .values(is_read=True)
+        .returning(Notification)
+    ).scalar_one_or_none()
+    db.commit()
     return notif
 
 
@@ -37,7 +41,6 @@ def create_notification(db: Session, notif: NotificationCreate):
     db_notif = Notification(**notif.dict())
     db.add(db_notif)
     db.commit()
-    db.refresh(db_notif)
     return db_notif
 
 
@@ -52,8 +55,13 @@ def create_notification_full(
     daily_plan_id: Optional[int] = None,
     schedule_id: Optional[int] = None,
     action_url: Optional[str] = None,
+    commit: bool = True,
 ):
-    """Create a notification with full details"""
+    """
+    Create a notification with full details.
+    With commit=False the row is only added; the caller's commit inserts it
+    together with any others in one batch.
+    """
     notif = Notification(
         user_id=user_id,
         title=title,
@@ -66,8 +74,8 @@ def create_notification_full(
         is_read=False,
     )
     db.add(notif)
-    db.commit()
-    db.refresh(notif)
+    if commit:
+        db.commit()
     return notif
 
 
@@ -1,9 +1,10 @@
 from typing import List
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
-from app.models.quiz import Quiz, QuizAttempt
+from app.models.quiz import Quiz, QuizAttempt, QuizQuestion
 from app.schemas.quiz import QuizCreate, QuizUpdate
 
 
@@ -36,21 +37,20 @@ class CRUDQuiz(CRUDBase[Quiz, QuizCreate, QuizUpdate]):
         obj_in_data = obj_in.dict(exclude={"questions"})
         db_obj = self.model(**obj_in_data, created_by=creator_id)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        
+
         # Add questions if provided
         if obj_in.questions:
-            from app.models.quiz import QuizQuestion
-            for question_data in obj_in.questions:
-                question = QuizQuestion(
-                    **question_data.dict(),
-                    quiz_id=db_obj.id
-                )
-                db.add(question)
-            db.commit()
-            db.refresh(db_obj)
-        
+            # Flush for the quiz id, then insert every question in one executemany
+            db.flush()
+            db.execute(
+                insert(QuizQuestion),
+                [
+                    {**question_data.dict(), "quiz_id": db_obj.id}
+                    for question_data in obj_in.questions
+                ],
+            )
+
+        db.commit()
         return db_obj
 
     def get_user_attempts(
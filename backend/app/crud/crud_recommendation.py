@@ -1,12 +1,25 @@
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import func, and_, or_, case, cast, literal, update, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime, timedelta
+from enum import Enum
 
 from app.models.recommendation import AdaptiveRecommendation, RecommendationType, RecommendationPriority
 from app.schemas.recommendation import RecommendationCreate, RecommendationUpdate, RecommendationInteraction
 
 
+# Current UTC time evaluated by Postgres (expires_at is a naive UTC timestamp).
+# Keeps expiry predicates free of per-request literals, so the compiled
+# statement and the server's plan are reused across requests.
+_SQL_UTCNOW = func.timezone('UTC', func.now())
+
+
+def _enum_val(value: Any) -> Any:
+    """Plain value for enum members; anything else is returned unchanged"""
+    return value.value if isinstance(value, Enum) else value
+
+
 class CRUDRecommendation:
     
     def create(
@@ -19,8 +32,8 @@ class CRUDRecommendation:
         """Create a new recommendation for a user"""
         db_recommendation = AdaptiveRecommendation(
             user_id=user_id,
-            type=recommendation.type.value if hasattr(recommendation.type, 'value') else recommendation.type,
-            priority=recommendation.priority.value if hasattr(recommendation.priority, 'value') else recommendation.priority,
+            type=_enum_val(recommendation.type),
+            priority=_enum_val(recommendation.priority),
             title=recommendation.title,
             description=recommendation.description,
             reason=recommendation.reason,
@@ -39,9 +52,8 @@ class CRUDRecommendation:
     
     def get(self, db: Session, recommendation_id: int) -> Optional[AdaptiveRecommendation]:
         """Get a recommendation by ID"""
-        return db.query(AdaptiveRecommendation).filter(
-            AdaptiveRecommendation.id == recommendation_id
-        ).first()
+        # Served from the session's identity map when already loaded
+        return db.get(AdaptiveRecommendation, recommendation_id)
     
     def get_user_recommendations(
         self,
@@ -55,7 +67,8 @@ class CRUDRecommendation:
         priority_filter: Optional[RecommendationPriority] = None
     ) -> List[AdaptiveRecommendation]:
         """Get all recommendations for a user with optional filters"""
-        query = db.query(AdaptiveRecommendation).filter(
+        # Responses only read columns; raiseload guards against N+1 lazy loads
+        query = db.query(AdaptiveRecommendation).options(raiseload('*')).filter(
             AdaptiveRecommendation.user_id == user_id
         )
         
@@ -66,7 +79,7 @@ class CRUDRecommendation:
                     AdaptiveRecommendation.is_accepted == 0,
                     or_(
                         AdaptiveRecommendation.expires_at.is_(None),
-                        AdaptiveRecommendation.expires_at > datetime.utcnow()
+                        AdaptiveRecommendation.expires_at > _SQL_UTCNOW
                     )
                 )
             )
@@ -115,7 +128,7 @@ class CRUDRecommendation:
             AdaptiveRecommendation.is_dismissed == 0,  # Exclude dismissed
             or_(
                 AdaptiveRecommendation.expires_at.is_(None),
-                AdaptiveRecommendation.expires_at > datetime.utcnow()
+                AdaptiveRecommendation.expires_at > _SQL_UTCNOW
             )
         )
         
@@ -149,6 +162,41 @@ class CRUDRecommendation:
         db.refresh(db_recommendation)
         return db_recommendation
     
+    def _update_returning(
+        self,
+        db: Session,
+        recommendation_id: int,
+        values: Dict[str, Any]
+    ) -> Optional[AdaptiveRecommendation]:
+        """
+        Apply values with one UPDATE ... RETURNING and commit.
+        Atomic in SQL, so concurrent interactions can't overwrite each other's
+        flags from a stale read, and no refresh SELECT is needed.
+        """
+        if not values:
+            return self.get(db, recommendation_id)
+        
+        db_recommendation = db.execute(
+            update(AdaptiveRecommendation)
+            .where(AdaptiveRecommendation.id == recommendation_id)
+            .values(**values)
+            .returning(AdaptiveRecommendation)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+        db.commit()
+        return db_recommendation
+    
+    @staticmethod
+    def _auto_viewed(now: datetime) -> Dict[str, Any]:
+        """Mark as viewed, keeping the original viewed_at on rows already seen"""
+        return {
+            "is_viewed": 1,
+            "viewed_at": case(
+                (AdaptiveRecommendation.is_viewed == 1, AdaptiveRecommendation.viewed_at),
+                else_=now
+            )
+        }
+    
     def mark_viewed(
         self,
         db: Session,
@@ -156,15 +204,9 @@ class CRUDRecommendation:
         recommendation_id: int
     ) -> Optional[AdaptiveRecommendation]:
         """Mark a recommendation as viewed"""
-        db_recommendation = self.get(db, recommendation_id)
-        if not db_recommendation:
-            return None
-        
-        db_recommendation.is_viewed = 1
-        db_recommendation.viewed_at = datetime.utcnow()
-        db.commit()
-        db.refresh(db_recommendation)
-        return db_recommendation
+        return self._update_returning(
+            db, recommendation_id, {"is_viewed": 1, "viewed_at": datetime.utcnow()}
+        )
     
     def mark_included_in_plan(
         self,
@@ -172,30 +214,78 @@ class CRUDRecommendation:
         *,
         recommendation_id: int,
         plan_id: int,
-        plan_date: str
+        plan_date: str,
+        commit: bool = True
     ) -> Optional[AdaptiveRecommendation]:
-        """Mark recommendation as included in a daily plan"""
-        db_recommendation = self.get(db, recommendation_id)
-        if not db_recommendation:
-            return None
-        
-        # Update extra_data to track plan inclusion
-        if not db_recommendation.extra_data:
-            db_recommendation.extra_data = {}
-        
-        db_recommendation.extra_data['included_in_plan'] = True
-        db_recommendation.extra_data['plan_id'] = plan_id
-        db_recommendation.extra_data['plan_date'] = plan_date
-        
-        # Also mark as viewed since user will see it in plan
-        if not db_recommendation.is_viewed:
-            db_recommendation.is_viewed = 1
-            db_recommendation.viewed_at = datetime.utcnow()
-        
-        db.commit()
-        db.refresh(db_recommendation)
+        """
+        Mark recommendation as included in a daily plan.
+        Pass commit=False to leave the commit to the caller's transaction.
+        """
+        db_recommendation = db.execute(
+            update(AdaptiveRecommendation)
+            .where(AdaptiveRecommendation.id == recommendation_id)
+            .values(**self._plan_inclusion_values(plan_id, plan_date))
+            .returning(AdaptiveRecommendation)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+        
+        if commit:
+            db.commit()
         return db_recommendation
     
+    @classmethod
+    def _plan_inclusion_values(cls, plan_id: int, plan_date: str) -> Dict[str, Any]:
+        """
+        SET values recording plan inclusion. The plan keys are merged into
+        extra_data server-side (in-place dict edits aren't tracked on a plain
+        JSON column), and the row is marked viewed since the user will see it.
+        """
+        plan_patch = {
+            'included_in_plan': True,
+            'plan_id': plan_id,
+            'plan_date': plan_date
+        }
+        merged_extra_data = func.coalesce(
+            cast(AdaptiveRecommendation.extra_data, JSONB),
+            cast(literal({}, JSONB), JSONB)
+        ).op('||')(cast(literal(plan_patch, JSONB), JSONB))
+        return {
+            "extra_data": cast(merged_extra_data, JSON),
+            **cls._auto_viewed(datetime.utcnow())
+        }
+    
+    def mark_many_included_in_plan(
+        self,
+        db: Session,
+        *,
+        recommendation_ids: List[int],
+        user_id: int,
+        plan_id: int,
+        plan_date: str,
+        commit: bool = True
+    ) -> int:
+        """
+        Bulk version of mark_included_in_plan: one UPDATE for all ids.
+        Merges the plan keys into extra_data server-side. Returns the number of rows updated.
+        """
+        if not recommendation_ids:
+            return 0
+        
+        stmt = (
+            update(AdaptiveRecommendation)
+            .where(
+                AdaptiveRecommendation.id.in_(recommendation_ids),
+                AdaptiveRecommendation.user_id == user_id
+            )
+            .values(**self._plan_inclusion_values(plan_id, plan_date))
+            .execution_options(synchronize_session=False)
+        )
+        result = db.execute(stmt)
+        
+        if commit:
+            db.commit()
+        return result.rowcount
+    
     def mark_accepted(
         self,
         db: Session,
@@ -203,18 +293,12 @@ class CRUDRecommendation:
         recommendation_id: int
     ) -> Optional[AdaptiveRecommendation]:
         """Mark a recommendation as accepted (user acted on it)"""
-        db_recommendation = self.get(db, recommendation_id)
-        if not db_recommendation:
-            return None
-        
-        db_recommendation.is_accepted = 1
-        db_recommendation.accepted_at = datetime.utcnow()
-        if not db_recommendation.is_viewed:
-            db_recommendation.is_viewed = 1
-            db_recommendation.viewed_at = datetime.utcnow()
-        db.commit()
-        db.refresh(db_recommendation)
-        return db_recommendation
+        now = datetime.utcnow()
+        return self._update_returning(
+            db,
+            recommendation_id,
+            {"is_accepted": 1, "accepted_at": now, **self._auto_viewed(now)}
+        )
     
     def mark_dismissed(
         self,
@@ -223,18 +307,12 @@ class CRUDRecommendation:
         recommendation_id: int
     ) -> Optional[AdaptiveRecommendation]:
         """Mark a recommendation as dismissed"""
-        db_recommendation = self.get(db, recommendation_id)
-        if not db_recommendation:
-            return None
-        
-        db_recommendation.is_dismissed = 1
-        db_recommendation.dismissed_at = datetime.utcnow()
-        if not db_recommendation.is_viewed:
-            db_recommendation.is_viewed = 1
-            db_recommendation.viewed_at = datetime.utcnow()
-        db.commit()
-        db.refresh(db_recommendation)
-        return db_recommendation
+        now = datetime.utcnow()
+        return self._update_returning(
+            db,
+            recommendation_id,
+            {"is_dismissed": 1, "dismissed_at": now, **self._auto_viewed(now)}
+        )
     
     def update_interaction(
         self,
@@ -244,38 +322,31 @@ class CRUDRecommendation:
         interaction: RecommendationInteraction
     ) -> Optional[AdaptiveRecommendation]:
         """Update user interaction with a recommendation"""
-        db_recommendation = self.get(db, recommendation_id)
-        if not db_recommendation:
-            return None
-        
         now = datetime.utcnow()
-        
-        if interaction.is_viewed is not None:
-            db_recommendation.is_viewed = 1 if interaction.is_viewed else 0
-            if interaction.is_viewed:
-                db_recommendation.viewed_at = now
+        values: Dict[str, Any] = {}
         
         if interaction.is_accepted is not None:
-            db_recommendation.is_accepted = 1 if interaction.is_accepted else 0
+            values["is_accepted"] = 1 if interaction.is_accepted else 0
             if interaction.is_accepted:
-                db_recommendation.accepted_at = now
-                # Auto-mark as viewed
-                if not db_recommendation.is_viewed:
-                    db_recommendation.is_viewed = 1
-                    db_recommendation.viewed_at = now
+                values["accepted_at"] = now
         
         if interaction.is_dismissed is not None:
-            db_recommendation.is_dismissed = 1 if interaction.is_dismissed else 0
+            values["is_dismissed"] = 1 if interaction.is_dismissed else 0
             if interaction.is_dismissed:
-                db_recommendation.dismissed_at = now
-                # Auto-mark as viewed
-                if not db_recommendation.is_viewed:
-                    db_recommendation.is_viewed = 1
-                    db_recommendation.viewed_at = now
-        
-        db.commit()
-        db.refresh(db_recommendation)
-        return db_recommendation
+                values["dismissed_at"] = now
+        
+        if interaction.is_viewed:
+            values.update(is_viewed=1, viewed_at=now)
+        elif interaction.is_accepted or interaction.is_dismissed:
+            # Auto-mark as viewed; an explicit is_viewed=False still ends up viewed now
+            if interaction.is_viewed is False:
+                values.update(is_viewed=1, viewed_at=now)
+            else:
+                values.update(self._auto_viewed(now))
+        elif interaction.is_viewed is False:
+            values["is_viewed"] = 0
+        
+        return self._update_returning(db, recommendation_id, values)
     
     def delete(self, db: Session, *, recommendation_id: int) -> bool:
         """Delete a recommendation"""
@@ -290,80 +361,56 @@ class CRUDRecommendation:
     def delete_expired(self, db: Session, *, user_id: Optional[int] = None) -> int:
         """Delete expired recommendations. Returns count of deleted items."""
         query = db.query(AdaptiveRecommendation).filter(
-            AdaptiveRecommendation.expires_at < datetime.utcnow()
+            AdaptiveRecommendation.expires_at < _SQL_UTCNOW
         )
         
         if user_id:
             query = query.filter(AdaptiveRecommendation.user_id == user_id)
         
-        count = query.count()
-        query.delete(synchronize_session=False)
+        # DELETE reports its own rowcount; no separate COUNT(*) pass
+        count = query.delete(synchronize_session=False)
         db.commit()
         return count
     
     def get_stats(self, db: Session, *, user_id: int) -> Dict[str, Any]:
         """Get recommendation statistics for a user"""
-        total = db.query(func.count(AdaptiveRecommendation.id)).filter(
-            AdaptiveRecommendation.user_id == user_id
-        ).scalar()
-        
-        active_count = db.query(func.count(AdaptiveRecommendation.id)).filter(
-            and_(
-                AdaptiveRecommendation.user_id == user_id,
+        rec_id = AdaptiveRecommendation.id
+        # Every headline counter in one scan via aggregate FILTER clauses
+        total, active_count, viewed, accepted, dismissed, expired = db.query(
+            func.count(rec_id),
+            func.count(rec_id).filter(
                 AdaptiveRecommendation.is_dismissed == 0,
                 AdaptiveRecommendation.is_accepted == 0,
                 or_(
                     AdaptiveRecommendation.expires_at.is_(None),
-                    AdaptiveRecommendation.expires_at > datetime.utcnow()
+                    AdaptiveRecommendation.expires_at > _SQL_UTCNOW
                 )
-            )
-        ).scalar()
-        
-        viewed = db.query(func.count(AdaptiveRecommendation.id)).filter(
-            AdaptiveRecommendation.user_id == user_id,
-            AdaptiveRecommendation.is_viewed == 1
-        ).scalar()
-        
-        accepted = db.query(func.count(AdaptiveRecommendation.id)).filter(
-            AdaptiveRecommendation.user_id == user_id,
-            AdaptiveRecommendation.is_accepted == 1
-        ).scalar()
-        
-        dismissed = db.query(func.count(AdaptiveRecommendation.id)).filter(
-            AdaptiveRecommendation.user_id == user_id,
-            AdaptiveRecommendation.is_dismissed == 1
-        ).scalar()
-        
-        expired = db.query(func.count(AdaptiveRecommendation.id)).filter(
-            and_(
-                AdaptiveRecommendation.user_id == user_id,
-                AdaptiveRecommendation.expires_at < datetime.utcnow()
-            )
-        ).scalar()
+            ),
+            func.count(rec_id).filter(AdaptiveRecommendation.is_viewed == 1),
+            func.count(rec_id).filter(AdaptiveRecommendation.is_accepted == 1),
+            func.count(rec_id).filter(AdaptiveRecommendation.is_dismissed == 1),
+            func.count(rec_id).filter(AdaptiveRecommendation.expires_at < _SQL_UTCNOW),
+        ).filter(
+            AdaptiveRecommendation.user_id == user_id
+        ).one()
         
         # Get count by type
-        by_type = {}
         type_counts = db.query(
             AdaptiveRecommendation.type,
             func.count(AdaptiveRecommendation.id)
         ).filter(
             AdaptiveRecommendation.user_id == user_id
         ).group_by(AdaptiveRecommendation.type).all()
-        
-        for rec_type, count in type_counts:
-            by_type[rec_type.value if hasattr(rec_type, 'value') else str(rec_type)] = count
+        by_type = {str(_enum_val(rec_type)): count for rec_type, count in type_counts}
         
         # Get count by priority
-        by_priority = {}
         priority_counts = db.query(
             AdaptiveRecommendation.priority,
             func.count(AdaptiveRecommendation.id)
         ).filter(
             AdaptiveRecommendation.user_id == user_id
         ).group_by(AdaptiveRecommendation.priority).all()
-        
-        for priority, count in priority_counts:
-            by_priority[priority.value if hasattr(priority, 'value') else str(priority)] = count
+        by_priority = {str(_enum_val(priority)): count for priority, count in priority_counts}
         
         # Calculate acceptance rate
         acceptance_rate = (accepted / total * 100) if total > 0 else 0.0
@@ -1,23 +1,29 @@
 from typing import List, Optional
 from datetime import datetime, date, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import case, delete, func, lambda_stmt, or_, select, update
 from decimal import Decimal
 
 from app.models.study_schedule import StudySchedule
 from app.models.daily_plan import DailyStudyPlan
+from app.models.study_session import StudySession
 from app.schemas.study_schedule import StudyScheduleCreate, StudyScheduleUpdate
+from app.crud import crud_daily_plan
+
+_CENT = Decimal("0.01")
 
 
 def get_schedule(
     db: Session, schedule_id: int, user_id: int
 ) -> Optional[StudySchedule]:
     """Get a single study schedule by ID"""
-    return (
-        db.query(StudySchedule)
-        .filter(and_(StudySchedule.id == schedule_id, StudySchedule.user_id == user_id))
-        .first()
-    )
+    # Session.get checks the identity map first, so repeat lookups within a
+    # request (e.g. get then update/activate) don't issue another SELECT
+    db_schedule = db.get(StudySchedule, schedule_id)
+    if db_schedule is None or db_schedule.user_id != user_id:
+        return None
+    return db_schedule
 
 
 def get_schedules(
@@ -44,37 +50,31 @@ def get_schedules(
 
 def get_active_schedule(db: Session, user_id: int) -> Optional[StudySchedule]:
     """Get the user's active study schedule"""
-    return (
-        db.query(StudySchedule)
-        .filter(and_(StudySchedule.user_id == user_id, StudySchedule.is_active == True))
-        .first()
+    # Hot path (dashboard, plan generation): lambda_stmt builds and caches the
+    # statement once per process; user_id is extracted as a bound parameter
+    stmt = lambda_stmt(
+        lambda: select(StudySchedule)
+        .where(StudySchedule.user_id == user_id, StudySchedule.is_active == True)
+        .limit(1)
     )
+    return db.scalars(stmt).first()
 
 
 def create_schedule(
     db: Session, schedule: StudyScheduleCreate, user_id: int
 ) -> StudySchedule:
     """Create a new study schedule"""
-    # Convert schedule_config and milestones to dicts
-    config_dict = (
-        schedule.schedule_config.model_dump()
-        if hasattr(schedule.schedule_config, "model_dump")
-        else schedule.schedule_config
-    )
-    milestones_dict = None
-    if schedule.milestones:
-        milestones_dict = [
-            m.model_dump() if hasattr(m, "model_dump") else m
-            for m in schedule.milestones
-        ]
+    # One recursive dump turns the nested config and milestone models into
+    # JSON-ready dicts for the JSON columns
+    data = schedule.model_dump(mode="json", include={"schedule_config", "milestones"})
 
     db_schedule = StudySchedule(
         user_id=user_id,
         goal_id=schedule.goal_id,
         schedule_name=schedule.schedule_name,
         schedule_type=schedule.schedule_type,
-        schedule_config=config_dict,
-        milestones=milestones_dict,
+        schedule_config=data["schedule_config"],
+        milestones=data["milestones"] or None,
         adaptation_mode=schedule.adaptation_mode,
         max_daily_load=schedule.max_daily_load,
         min_daily_load=schedule.min_daily_load,
@@ -84,7 +84,6 @@ def create_schedule(
 
     db.add(db_schedule)
     db.commit()
-    db.refresh(db_schedule)
     return db_schedule
 
 
@@ -96,20 +95,9 @@ def update_schedule(
     if not db_schedule:
         return None
 
+    # model_dump already converts nested schedule_config/milestones models to dicts
     update_data = schedule_update.model_dump(exclude_unset=True)
 
-    # Handle schedule_config conversion
-    if "schedule_config" in update_data and update_data["schedule_config"]:
-        if hasattr(update_data["schedule_config"], "model_dump"):
-            update_data["schedule_config"] = update_data["schedule_config"].model_dump()
-
-    # Handle milestones conversion
-    if "milestones" in update_data and update_data["milestones"]:
-        update_data["milestones"] = [
-            m.model_dump() if hasattr(m, "model_dump") else m
-            for m in update_data["milestones"]
-        ]
-
     for field, value in update_data.items():
         setattr(db_schedule, field, value)
 
@@ -142,32 +130,56 @@ def activate_schedule(
     if not db_schedule:
         return None
 
-    # Deactivate all other active schedules for this user
-    db.query(StudySchedule).filter(
-        and_(
+    # Activate this schedule and deactivate the user's others in one UPDATE
+    now = datetime.utcnow()
+    is_target = StudySchedule.id == schedule_id
+    db.execute(
+        update(StudySchedule)
+        .where(
             StudySchedule.user_id == user_id,
-            StudySchedule.id != schedule_id,
-            StudySchedule.is_active == True,
+            or_(StudySchedule.is_active == True, is_target),
         )
-    ).update({"is_active": False, "deactivated_at": datetime.utcnow()})
-
-    # Activate this schedule
-    db_schedule.is_active = True
-    db_schedule.deactivated_at = None
+        .values(
+            is_active=case((is_target, True), else_=False),
+            deactivated_at=case((is_target, None), else_=now),
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    # Mirror the written values on the loaded object without another UPDATE or SELECT
+    set_committed_value(db_schedule, "is_active", True)
+    set_committed_value(db_schedule, "deactivated_at", None)
+    set_committed_value(db_schedule, "updated_at", now)
     db.commit()
-    db.refresh(db_schedule)
     return db_schedule
 
 
 def delete_schedule(db: Session, schedule_id: int, user_id: int) -> bool:
     """Delete a study schedule (cascade deletes daily plans)"""
-    db_schedule = get_schedule(db, schedule_id, user_id)
-    if not db_schedule:
-        return False
-
-    db.delete(db_schedule)
+    # Plain DELETEs instead of loading the schedule, its plans and their sessions
+    # for the ORM cascade. Study sessions go first, as the ORM cascade did (their
+    # FK would otherwise only SET NULL); the plans follow via ON DELETE CASCADE.
+    owned_plan_ids = (
+        select(DailyStudyPlan.id)
+        .join(StudySchedule, DailyStudyPlan.schedule_id == StudySchedule.id)
+        .where(StudySchedule.id == schedule_id, StudySchedule.user_id == user_id)
+    )
+    db.execute(
+        delete(StudySession)
+        .where(StudySession.daily_plan_id.in_(owned_plan_ids))
+        .execution_options(synchronize_session=False)
+    )
+    result = db.execute(
+        delete(StudySchedule)
+        .where(StudySchedule.id == schedule_id, StudySchedule.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
-    return True
+    deleted = result.rowcount > 0
+    if deleted:
+        # The cascade removed this schedule's plans, so cached plan stats are stale
+        crud_daily_plan._invalidate_stats_cache(user_id)
+    return deleted
 
 
 def update_schedule_stats(
@@ -178,21 +190,25 @@ def update_schedule_stats(
     if not db_schedule:
         return None
 
-    # Get all plans for this schedule
-    plans = (
-        db.query(DailyStudyPlan).filter(DailyStudyPlan.schedule_id == schedule_id).all()
+    # Count plan outcomes in SQL instead of hydrating every plan for this schedule
+    total_days, completed, missed, partially = (
+        db.query(
+            func.count(DailyStudyPlan.id),
+            func.count(DailyStudyPlan.id).filter(DailyStudyPlan.is_completed == True),
+            func.count(DailyStudyPlan.id).filter(DailyStudyPlan.status == "skipped"),
+            func.count(DailyStudyPlan.id).filter(
+                DailyStudyPlan.status == "partially_completed"
+            ),
+        )
+        .filter(DailyStudyPlan.schedule_id == schedule_id)
+        .one()
     )
 
-    # Calculate statistics
-    total_days = len(plans)
-    completed = sum(1 for p in plans if p.is_completed)
-    missed = sum(1 for p in plans if p.status == "skipped")
-    partially = sum(1 for p in plans if p.status == "partially_completed")
-
     # Calculate adherence rate
-    adherence_rate = Decimal(0.0)
+    # Exact decimal division, rounded to the column's two decimal places
+    adherence_rate = Decimal("0.00")
     if total_days > 0:
-        adherence_rate = Decimal((completed / total_days) * 100)
+        adherence_rate = (Decimal(completed) * 100 / total_days).quantize(_CENT)
 
     # Update schedule
     db_schedule.total_days_scheduled = total_days
@@ -212,21 +228,28 @@ def get_schedule_plans(
     user_id: int,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    limit: int = 366,
 ) -> List[DailyStudyPlan]:
-    """Get all daily plans for a schedule"""
+    """Get daily plans for a schedule (at most `limit`, one year by default)"""
     # Verify schedule belongs to user
     schedule = get_schedule(db, schedule_id, user_id)
     if not schedule:
         return []
 
-    query = db.query(DailyStudyPlan).filter(DailyStudyPlan.schedule_id == schedule_id)
+    # Plan responses are flat columns; raiseload turns any accidental
+    # per-row relationship load (N+1) into an error instead of a query
+    query = (
+        db.query(DailyStudyPlan)
+        .options(raiseload("*"))
+        .filter(DailyStudyPlan.schedule_id == schedule_id)
+    )
 
     if start_date:
         query = query.filter(DailyStudyPlan.plan_date >= start_date)
     if end_date:
         query = query.filter(DailyStudyPlan.plan_date <= end_date)
 
-    return query.order_by(DailyStudyPlan.plan_date).all()
+    return query.order_by(DailyStudyPlan.plan_date).limit(limit).all()
 
 
 def get_upcoming_plans(
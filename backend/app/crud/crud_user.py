@@ -1,23 +1,110 @@
+from functools import lru_cache
 from typing import Any, Dict, Optional, Union
-from sqlalchemy.orm import Session
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, make_transient_to_detached, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime
-from app.core.security import get_password_hash, verify_password
+import json
+import secrets
+import logging
+from app.core.security import get_password_hash, password_needs_rehash, verify_password
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+# Optional Redis client — user lookups fall back to the database without it
+try:
+    from app.core.redis import redis_client  # type: ignore
+except Exception:
+    redis_client = None
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_TTL = 60  # seconds
+# Column values cached per user; the password hash is never copied to Redis
+_CACHED_COLUMNS = tuple(
+    attr.key for attr in User.__mapper__.column_attrs if attr.key != "hashed_password"
+)
+_DATETIME_COLUMNS = frozenset(("created_at", "updated_at", "last_login"))
+
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    """
+    Verified against when there is no usable stored hash, so a login for an
+    unknown or OAuth-only account costs as much as a wrong password.
+    Computed on the first such login instead of at import.
+    """
+    return get_password_hash(secrets.token_urlsafe(16))
+
+
+def _user_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
+    # ===== CACHE =====
+    def get_cached(self, db: Session, *, id: int) -> Optional[User]:
+        """
+        Primary-key lookup backed by a short-lived Redis copy of the row.
+        A cache hit is attached to the session without issuing a SELECT.
+        """
+        key = _user_cache_key(id)
+        if redis_client is not None:
+            try:
+                raw = redis_client.get(key)
+            except Exception as e:
+                logger.warning("Redis get failed for %s, using database: %s", key, e)
+                raw = None
+            if raw:
+                data = json.loads(raw)
+                for column in _DATETIME_COLUMNS:
+                    if data.get(column):
+                        data[column] = datetime.fromisoformat(data[column])
+                cached_user = User(**data)
+                make_transient_to_detached(cached_user)
+                return db.merge(cached_user, load=False)
+
+        db_obj = self.get(db, id=id)
+        if db_obj is not None and redis_client is not None:
+            data = {column: getattr(db_obj, column) for column in _CACHED_COLUMNS}
+            for column in _DATETIME_COLUMNS:
+                if data.get(column):
+                    data[column] = data[column].isoformat()
+            try:
+                redis_client.setex(key, USER_CACHE_TTL, json.dumps(data))
+            except Exception as e:
+                logger.warning("Redis setex failed for %s: %s", key, e)
+        return db_obj
+
+    def invalidate_cache(self, user_id: int) -> None:
+        """Drop the cached copy after the user's row has been modified"""
+        if redis_client is None:
+            return
+        try:
+            redis_client.delete(_user_cache_key(user_id))
+        except Exception as e:
+            logger.warning("Redis delete failed for user %s: %s", user_id, e)
+
     # ===== GET methods =====
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
-        return db.query(User).filter(User.email == email).first()
+        return db.query(User).filter(func.lower(User.email) == email.lower()).first()
 
     def get_by_username(self, db: Session, *, username: str) -> Optional[User]:
         return db.query(User).filter(User.username == username).first()
 
     def get_by_id(self, db: Session, *, user_id: int) -> Optional[User]:
-        return db.query(User).filter(User.id == user_id).first()
+        return db.get(User, user_id)
+
+    def get_with_daily_plans(self, db: Session, *, user_id: int) -> Optional[User]:
+        """User with daily plans and learning profile loaded in two batched SELECTs"""
+        return (
+            db.query(User)
+            .options(selectinload(User.daily_plans), selectinload(User.learning_profile))
+            .filter(User.id == user_id)
+            .first()
+        )
 
     # ===== CREATE =====
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
@@ -28,7 +115,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             hashed_password = get_password_hash(obj_in.password)
 
         db_obj = User(
-            email=obj_in.email,
+            email=obj_in.email.lower(),
             username=obj_in.username,
             hashed_password=hashed_password,
             full_name=obj_in.full_name,
@@ -38,7 +125,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             daily_study_time=obj_in.daily_study_time,
             oauth_provider=obj_in.oauth_provider,
             oauth_id=obj_in.oauth_id,
-            oauth_email=obj_in.oauth_email,
+            oauth_email=obj_in.oauth_email.lower() if obj_in.oauth_email else None,
             oauth_avatar=obj_in.oauth_avatar,
             is_oauth_account=obj_in.is_oauth_account,
         )
@@ -52,13 +139,17 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
     ) -> User:
         update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        if update_data.get("email"):
+            update_data["email"] = update_data["email"].lower()
         if update_data.get("password"):
             hashed_password = get_password_hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
 
         db_obj.updated_at = datetime.utcnow()
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        updated = super().update(db, db_obj=db_obj, obj_in=update_data)
+        self.invalidate_cache(updated.id)
+        return updated
 
     # ===== AUTH =====
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
@@ -67,24 +158,26 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         OAuth accounts cannot login with password - they must use OAuth flow.
         """
         user = self.get_by_email(db, email=email)
-        if not user:
-            return None
-
-        # OAuth accounts cannot login with password
-        if user.is_oauth_account:
-            return None
-
-        # Check if user has a password set
-        if not user.hashed_password:
-            return None
-
-        # Verify password
-        if not verify_password(password, user.hashed_password):
+        # OAuth accounts cannot login with password, and neither can users
+        # without one; the hash check still runs so every failure takes as long
+        can_use_password = bool(
+            user and not user.is_oauth_account and user.hashed_password
+        )
+        target_hash = user.hashed_password if can_use_password else _dummy_password_hash()
+        password_ok = verify_password(password, target_hash)
+        if not (can_use_password and password_ok):
             return None
 
-        # Update last login
-        user.last_login = datetime.utcnow()
+        # Update last login with a targeted UPDATE rather than an ORM flush;
+        # legacy bcrypt (or outdated Argon2) hashes are upgraded in the same statement
+        values = {"last_login": datetime.utcnow()}
+        if password_needs_rehash(user.hashed_password):
+            values["hashed_password"] = get_password_hash(password)
+        db.execute(update(User).where(User.id == user.id).values(**values))
         db.commit()
+        for key, value in values.items():
+            set_committed_value(user, key, value)
+        self.invalidate_cache(user.id)
         return user
 
     # ===== PASSWORD CHANGE =====
@@ -96,6 +189,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         user.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(user)
+        self.invalidate_cache(user.id)
         return user
 
     # ===== AVATAR UPLOAD =====
@@ -107,6 +201,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         user.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(user)
+        self.invalidate_cache(user.id)
         return user
     
     
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import anyio.to_thread
 
 from app.core.config import settings
 from app.api.api_v1.api import api_router
@@ -11,6 +12,10 @@ import os
 async def lifespan(app: FastAPI):
     # Startup events
     print("🚀 File2Learning is starting up...")
+    # Sync routes (DB access and the password hashing in login/register/password
+    # changes) run on AnyIO's worker threads; its default of 40 is kept unless set
+    if settings.THREADPOOL_SIZE:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
     yield
     # Shutdown events  
     print("👋 Shutting down...")
@@ -28,7 +33,7 @@ os.makedirs("app/static/avatars", exist_ok=True)
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # CORS middleware
-_default_origins = {
+_default_origins = frozenset({
     "http://localhost",
     "http://127.0.0.1",
     "http://localhost:3000",
@@ -37,17 +42,15 @@ _default_origins = {
     "http://127.0.0.1:5173",
     "http://localhost:5174",
     "http://127.0.0.1:5174",
-}
+})
 
-# Merge with settings.ALLOWED_HOSTS (which may come from env)
-allowed_hosts = getattr(settings, "ALLOWED_HOSTS", []) or []
-_default_origins.update(host.strip() for host in allowed_hosts if host)
-
-# Remove duplicates and None values
-origins = sorted(filter(None, _default_origins))
+# Merge with the configured origins (ALLOWED_HOSTS / BACKEND_CORS_ORIGINS).
+# A frozenset keeps the per-request origin check an O(1) lookup. "*" is not
+# an origin: left in the set, Starlette would treat it as allow-all.
+origins = (_default_origins | settings.cors_origins) - {"*"}
 
 # Allow all origins if explicitly configured via ALLOWED_HOSTS
-allow_all = "*" in allowed_hosts
+allow_all = "*" in settings.ALLOWED_HOSTS
 
 app.add_middleware(
     CORSMiddleware,
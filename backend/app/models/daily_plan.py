@@ -10,6 +10,7 @@ from sqlalchemy import (
     Boolean,
     DECIMAL,
     CheckConstraint,
+    Index,
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -92,6 +93,9 @@ class DailyStudyPlan(Base):
             "effectiveness_rating IS NULL OR (effectiveness_rating >= 1 AND effectiveness_rating <= 5)",
             name="chk_effectiveness",
         ),
+        # Every plan lookup filters by user and date range/status
+        Index("idx_daily_study_plans_user_date", "user_id", "plan_date"),
+        Index("idx_daily_study_plans_user_status", "user_id", "status"),
     )
 
     def __repr__(self):
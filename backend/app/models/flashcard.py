@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -43,3 +43,9 @@ class Flashcard(Base):
     # Relationships
     owner = relationship("User", back_populates="flashcards")
     document = relationship("Document", back_populates="flashcards")
+
+    __table_args__ = (
+        # Mastered-word counts (progress stats, vocabulary goals) only touch these rows
+        Index('idx_flashcards_owner_mastered', 'owner_id',
+              postgresql_where=text("ease_factor >= 2.0 AND repetitions >= 2")),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, JSON, Boolean, CheckConstraint
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, JSON, Boolean, CheckConstraint, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -79,6 +79,9 @@ class LearningGoal(Base):
         CheckConstraint("completion_percentage >= 0 AND completion_percentage <= 100", 
                        name='chk_completion_percentage'),
         CheckConstraint("days_behind >= 0", name='chk_days_behind'),
+        # Active-goal lookups (plan completion, plan generation) only ever touch active rows
+        Index('idx_learning_goals_user_active', 'user_id',
+              postgresql_where=text("status = 'active'")),
     )
     
     def __repr__(self):
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, func, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, func, ForeignKey, Index, text
 from app.core.database import Base
 
 
@@ -26,3 +26,10 @@ class Notification(Base):
 
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Notification feed: WHERE user_id = ? ORDER BY created_at DESC, read in index order
+        Index("idx_notifications_user_created", "user_id", created_at.desc()),
+        # mark_all_as_read / unread badge only touch unread rows
+        Index("idx_notifications_user_unread", "user_id", postgresql_where=text("is_read = false")),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, JSON, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, JSON, Text, Index, text, Enum as SQLEnum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -67,6 +67,16 @@ class AdaptiveRecommendation(Base):
     # Relationships
     user = relationship("User", back_populates="adaptive_recommendations")
     
+    __table_args__ = (
+        # Active feed: not dismissed/accepted, in the feed's sort order. Expiry
+        # stays in the query since now() can't appear in an index predicate.
+        Index(
+            "idx_adaptive_recommendations_user_active",
+            "user_id", priority.desc(), relevance_score.desc(), created_at.desc(),
+            postgresql_where=text("is_dismissed = 0 AND is_accepted = 0")
+        ),
+    )
+    
     def __repr__(self):
         return f"<AdaptiveRecommendation(id={self.id}, user_id={self.user_id}, type={self.type}, priority={self.priority})>"
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -9,7 +9,7 @@ class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
+    email = Column(String, nullable=False)  # stored lowercased, unique via idx_users_lower_email
     username = Column(String, unique=True, index=True, nullable=False)
 
     hashed_password = Column(String, nullable=True)
@@ -37,15 +37,22 @@ class User(Base):
     last_login = Column(DateTime, nullable=True)
 
     # Relationships
-    documents = relationship("Document", back_populates="owner")
-    flashcards = relationship("Flashcard", back_populates="owner")
-    quiz_attempts = relationship("QuizAttempt", back_populates="user")
+    # Collections never load implicitly: use CRUDUser.get_with_daily_plans or a
+    # direct query by user_id, so an accidental N+1 fails fast instead of going slow.
+    documents = relationship("Document", back_populates="owner", lazy="raise")
+    flashcards = relationship("Flashcard", back_populates="owner", lazy="raise")
+    quiz_attempts = relationship("QuizAttempt", back_populates="user", lazy="raise")
     
     # Adaptive Learning Relationships
     learning_profile = relationship("LearningProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
-    learning_goals = relationship("LearningGoal", back_populates="user", cascade="all, delete-orphan")
-    study_schedules = relationship("StudySchedule", back_populates="user", cascade="all, delete-orphan")
-    daily_plans = relationship("DailyStudyPlan", back_populates="user", cascade="all, delete-orphan")
-    study_sessions = relationship("StudySession", back_populates="user", cascade="all, delete-orphan")
-    learning_analytics = relationship("LearningAnalytics", back_populates="user", cascade="all, delete-orphan")
-    adaptive_recommendations = relationship("AdaptiveRecommendation", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    learning_goals = relationship("LearningGoal", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+    study_schedules = relationship("StudySchedule", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+    daily_plans = relationship("DailyStudyPlan", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+    study_sessions = relationship("StudySession", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+    learning_analytics = relationship("LearningAnalytics", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+    adaptive_recommendations = relationship("AdaptiveRecommendation", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+
+    __table_args__ = (
+        # Case-insensitive uniqueness; also serves the LOWER(email) login lookup
+        Index('idx_users_lower_email', func.lower(email), unique=True),
+    )
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr, Field, constr
+from pydantic import AliasChoices, BaseModel, EmailStr, Field, constr
 from datetime import datetime
 
 
@@ -45,6 +45,12 @@ class LearningSetup(BaseModel):
 
 class UserInDBBase(UserBase):
     id: Optional[int] = None
+    # Read the legacy JSON column rather than the ``User.learning_goals``
+    # relationship, which would lazy-load LearningGoal rows on every dump.
+    learning_goals: Optional[List[str]] = Field(
+        default=None,
+        validation_alias=AliasChoices("legacy_learning_goals", "learning_goals"),
+    )
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     last_login: Optional[datetime] = None
@@ -5,11 +5,13 @@ import secrets
 import httpx
 from typing import Dict, Any, Tuple
 from urllib.parse import urlencode
+from sqlalchemy import func
 
 from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.user import User
 from app.core.security import create_access_token
+from app.crud import user as crud_user
 
 
 class OAuthService:
@@ -103,6 +105,8 @@ class OAuthService:
         # Google returns "sub", GitHub/Microsoft return "id"
         oauth_id = str(oauth_data.get("id") or oauth_data.get("sub"))
         email = oauth_data.get("email")
+        if email:
+            email = email.lower()
 
         existing_user = (
             self.db.query(User)
@@ -117,7 +121,7 @@ class OAuthService:
             return existing_user, False
 
         existing_email_user = (
-            self.db.query(User).filter(User.email == email).first() if email else None
+            self.db.query(User).filter(func.lower(User.email) == email).first() if email else None
         )
 
         if existing_email_user:
@@ -130,6 +134,7 @@ class OAuthService:
             )
             existing_email_user.is_oauth_account = True
             self.db.commit()
+            crud_user.invalidate_cache(existing_email_user.id)
             return existing_email_user, False
 
         # Create new user
@@ -5,7 +5,7 @@ Handles automatic schedule adjustments based on user performance and missed days
 
 from typing import Dict, Any, Optional, List
 from datetime import date, datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import and_, func
 from decimal import Decimal
 
@@ -69,9 +69,19 @@ class ScheduleAdjuster:
         """Analyze schedule performance metrics"""
         today = date.today()
 
-        # Get all plans for this schedule
+        # Get all plans for this schedule; the analysis never reads the task
+        # lists, so only the status/performance columns are loaded
         plans = (
             self.db.query(DailyStudyPlan)
+            .options(
+                load_only(
+                    DailyStudyPlan.plan_date,
+                    DailyStudyPlan.status,
+                    DailyStudyPlan.is_completed,
+                    DailyStudyPlan.actual_performance,
+                    DailyStudyPlan.total_estimated_minutes,
+                )
+            )
             .filter(DailyStudyPlan.schedule_id == self.schedule.id)
             .order_by(DailyStudyPlan.plan_date)
             .all()
@@ -81,9 +91,11 @@ class ScheduleAdjuster:
         missed_days = []
         completed_days = []
         partially_completed = []
+        total_past_days = 0
 
         for plan in plans:
             if plan.plan_date < today:
+                total_past_days += 1
                 if plan.status == "skipped":
                     missed_days.append(plan)
                 elif plan.is_completed:
@@ -92,7 +104,6 @@ class ScheduleAdjuster:
                     partially_completed.append(plan)
 
         # Calculate adherence rate
-        total_past_days = len([p for p in plans if p.plan_date < today])
         adherence_rate = (
             (len(completed_days) / total_past_days * 100) if total_past_days > 0 else 0
         )
@@ -2,8 +2,13 @@ import logging
 from typing import Optional, Dict
 from datetime import date, datetime
 
+from sqlalchemy import func, and_
+from sqlalchemy.orm import load_only
+
 from app.tasks.celery_app import celery_app
 from app.core.database import SessionLocal
+from app.models.learning_goal import LearningGoal
+from app.models.flashcard import Flashcard
 from app.services.recommendation_engine import generate_recommendations_for_user
 from app.services.schedule_adjuster import adjust_schedule
 from app.crud import crud_study_schedule
@@ -35,27 +40,40 @@ def process_learning_event_task(
         )
 
         # 1. Update Learning Goals based on event type
-        from app.models.learning_goal import LearningGoal
-        from app.models.flashcard import Flashcard
-        from sqlalchemy import func, and_
-        
-        active_goals = db.query(LearningGoal).filter(
+        # Only the columns the goal updates read; current_progress/milestones are overwritten, never read
+        active_goals = db.query(LearningGoal).options(
+            load_only(
+                LearningGoal.id,
+                LearningGoal.goal_type,
+                LearningGoal.target_metrics,
+                LearningGoal.completion_percentage,
+                LearningGoal.start_date,
+                LearningGoal.target_date,
+                LearningGoal.status,
+            )
+        ).filter(
             and_(
                 LearningGoal.user_id == user_id,
                 LearningGoal.status == 'active'
             )
         ).all()
         
+        today = date.today()
+        now = datetime.utcnow()
+        # The mastered-flashcard count doesn't depend on the goal: query it at most once
+        vocab_count = None
+        
         for goal in active_goals:
             if goal.goal_type == 'vocabulary_count' and event_type == 'flashcard_reviewed':
                 # Update vocabulary count goal when flashcard is reviewed
                 if payload and payload.get('is_correct', False):
                     # Count mastered flashcards
-                    vocab_count = db.query(func.count(Flashcard.id)).filter(
-                        Flashcard.owner_id == user_id,
-                        Flashcard.ease_factor >= 2.0,
-                        Flashcard.repetitions >= 2
-                    ).scalar() or 0
+                    if vocab_count is None:
+                        vocab_count = db.query(func.count(Flashcard.id)).filter(
+                            Flashcard.owner_id == user_id,
+                            Flashcard.ease_factor >= 2.0,
+                            Flashcard.repetitions >= 2
+                        ).scalar() or 0
                     
                     target_vocab = goal.target_metrics.get('vocabulary', 0)
                     percentage = int((vocab_count / target_vocab * 100)) if target_vocab > 0 else 0
@@ -64,14 +82,14 @@ def process_learning_event_task(
                         "vocabulary": vocab_count,
                         "percentage": float(percentage),
                         "on_track": percentage >= 0,
-                        "days_active": (date.today() - goal.start_date).days
+                        "days_active": (today - goal.start_date).days
                     }
                     goal.completion_percentage = percentage
                     
                     if vocab_count >= target_vocab:
                         goal.status = 'completed'
-                        goal.completed_at = datetime.utcnow()
-                        goal.actual_completion_date = date.today()
+                        goal.completed_at = now
+                        goal.actual_completion_date = today
             
             elif goal.goal_type == 'quiz_score' and event_type == 'quiz_completed':
                 # Update quiz score goal when quiz is completed
@@ -90,17 +108,17 @@ def process_learning_event_task(
                     
                     if percentage_score >= target_score:
                         goal.status = 'completed'
-                        goal.completed_at = datetime.utcnow()
-                        goal.actual_completion_date = date.today()
+                        goal.completed_at = now
+                        goal.actual_completion_date = today
             
             # Update is_on_track and days_behind
-            today = date.today()
             total_days = (goal.target_date - goal.start_date).days
             days_passed = (today - goal.start_date).days
-            expected_progress = (days_passed / total_days * 100) if total_days > 0 else 0
+            expected_progress = (days_passed * 100.0 / total_days) if total_days > 0 else 0.0
             
             goal.is_on_track = goal.completion_percentage >= (expected_progress - 10)
-            goal.days_behind = max(0, int((expected_progress - goal.completion_percentage) / (100 / total_days)) if total_days > 0 else 0)
+            # Percentage points behind, scaled back to days (one multiply, no second division)
+            goal.days_behind = max(0, int((expected_progress - goal.completion_percentage) * total_days / 100)) if total_days > 0 else 0
         
         # 2. Refresh personalized recommendations (now with updated goals)
         new_recs = generate_recommendations_for_user(db, user_id, max_recommendations=10)
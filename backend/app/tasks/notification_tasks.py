@@ -1,4 +1,5 @@
 from celery import shared_task
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 from datetime import date
 import logging
@@ -24,86 +25,108 @@ def check_daily_study_progress():
     db: Session = SessionLocal()
     try:
         today = date.today()
-        users = db.query(User).filter(User.is_active == True).all()
-        count_reminded = 0
 
-        logger.info(
-            f"🚀 Bắt đầu kiểm tra tiến độ ngày {today} cho {len(users)} users..."
+        # One outer-joined, column-only query streamed in batches replaces
+        # loading every User and querying each one's plan separately. Only the
+        # users who need a reminder are kept; notifications are written after
+        # the stream is drained and inserted with a single commit.
+        rows = (
+            db.query(
+                User.id,
+                User.username,
+                User.email,
+                DailyStudyPlan.id,
+                DailyStudyPlan.status,
+                DailyStudyPlan.schedule_id,
+            )
+            .outerjoin(
+                DailyStudyPlan,
+                and_(
+                    DailyStudyPlan.user_id == User.id,
+                    DailyStudyPlan.plan_date == today,
+                ),
+            )
+            .filter(User.is_active == True)
+            .execution_options(yield_per=500)
         )
 
-        for user in users:
-            # Tìm plan của hôm nay
-            daily_plan = (
-                db.query(DailyStudyPlan)
-                .filter(
-                    DailyStudyPlan.user_id == user.id,
-                    DailyStudyPlan.plan_date == today,
+        seen_users = set()
+        pending_reminders = []
+        for user_id, username, email, plan_id, plan_status, schedule_id in rows:
+            if user_id in seen_users:
+                continue
+            seen_users.add(user_id)
+            if plan_id is None or plan_status != "completed":
+                pending_reminders.append(
+                    (user_id, username, email, plan_id, schedule_id)
                 )
-                .first()
-            )
 
-            should_remind = False
-            msg_title = ""
-            msg_body = ""
-            notification_type = "reminder"
+        count_reminded = 0
+        reminder_emails = []
+
+        logger.info(
+            f"🚀 Bắt đầu kiểm tra tiến độ ngày {today} cho {len(seen_users)} users..."
+        )
 
+        for user_id, username, email, plan_id, schedule_id in pending_reminders:
             # Logic kiểm tra
-            if not daily_plan:
-                should_remind = True
+            if plan_id is None:
                 msg_title = "⚠️ Bạn chưa lập kế hoạch học tập!"
-                msg_body = f"Xin chào {user.username or 'bạn'}, hôm nay bạn chưa thiết lập mục tiêu học tập. Hãy dành 5 phút để bắt đầu nhé!"
+                msg_body = f"Xin chào {username or 'bạn'}, hôm nay bạn chưa thiết lập mục tiêu học tập. Hãy dành 5 phút để bắt đầu nhé!"
                 notification_type = "warning"
 
-            elif daily_plan.status != "completed":
-                should_remind = True
+            else:
                 msg_title = "⏰ Nhắc nhở: Hoàn thành bài học ngay!"
-                msg_body = f"Xin chào {user.username or 'bạn'}, bạn vẫn chưa hoàn thành kế hoạch học tập hôm nay. Cố lên, chỉ còn một chút nữa thôi!"
+                msg_body = f"Xin chào {username or 'bạn'}, bạn vẫn chưa hoàn thành kế hoạch học tập hôm nay. Cố lên, chỉ còn một chút nữa thôi!"
                 notification_type = "reminder"
 
-            # Thực hiện gửi (nếu cần)
-            if should_remind:
-                # 1. Lưu thông báo vào Web (với tất cả fields mới)
-                notif = crud_notification.create_notification_full(
-                    db=db,
-                    user_id=user.id,
-                    title=msg_title,
-                    body=msg_body,
-                    type=notification_type,
-                    source_type="reminder_task",
-                    daily_plan_id=daily_plan.id if daily_plan else None,
-                    schedule_id=daily_plan.schedule_id if daily_plan else None,
-                    action_url=(
-                        f"/daily-plans/{daily_plan.id}" if daily_plan else "/dashboard"
-                    ),
-                )
+            # 1. Lưu thông báo vào Web (với tất cả fields mới)
+            notif = crud_notification.create_notification_full(
+                db=db,
+                user_id=user_id,
+                title=msg_title,
+                body=msg_body,
+                type=notification_type,
+                source_type="reminder_task",
+                daily_plan_id=plan_id,
+                schedule_id=schedule_id,
+                action_url=(
+                    f"/daily-plans/{plan_id}" if plan_id else "/dashboard"
+                ),
+                commit=False,
+            )
+            reminder_emails.append((email, msg_title, msg_body, notif.action_url))
 
-                # 2. Gửi Email
-                if user.email:
-                    html_content = f"""
-                    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e0e0e0; border-radius: 10px;">
-                        <h2 style="color: #d97706; text-align: center;">{msg_title}</h2>
-                        <p style="font-size: 16px; color: #333;">{msg_body}</p>
-                        <div style="text-align: center; margin-top: 30px;">
-                            <a href="http://localhost:3000{notif.action_url}" 
-                               style="background-color: #2563EB; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; font-weight: bold;">
-                               Vào học ngay 🚀
-                            </a>
-                        </div>
-                        <p style="margin-top: 30px; font-size: 12px; color: #666; text-align: center;">
-                            File2Learning Automation System
-                        </p>
-                    </div>
-                    """
-                    send_email(
-                        subject=msg_title,
-                        to=user.email,
-                        body=html_content,
-                        is_html=True,
-                    )
-
-                count_reminded += 1
+            count_reminded += 1
 
         db.commit()
+
+        # 2. Gửi Email (only once the notifications are stored)
+        for email, msg_title, msg_body, action_url in reminder_emails:
+            if not email:
+                continue
+            html_content = f"""
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e0e0e0; border-radius: 10px;">
+                <h2 style="color: #d97706; text-align: center;">{msg_title}</h2>
+                <p style="font-size: 16px; color: #333;">{msg_body}</p>
+                <div style="text-align: center; margin-top: 30px;">
+                    <a href="http://localhost:3000{action_url}" 
+                       style="background-color: #2563EB; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; font-weight: bold;">
+                       Vào học ngay 🚀
+                    </a>
+                </div>
+                <p style="margin-top: 30px; font-size: 12px; color: #666; text-align: center;">
+                    File2Learning Automation System
+                </p>
+            </div>
+            """
+            send_email(
+                subject=msg_title,
+                to=email,
+                body=html_content,
+                is_html=True,
+            )
+
         logger.info(f"✅ Hoàn tất. Đã nhắc nhở {count_reminded} người dùng.")
 
     except Exception as e:
@@ -2,16 +2,16 @@
 """
 Simple script to test database connection from host
 """
-import psycopg2
+import psycopg
 import sys
 
 def test_connection(host, port, database, user, password):
     """Test database connection"""
     try:
-        conn = psycopg2.connect(
+        conn = psycopg.connect(
             host=host,
             port=port,
-            database=database,
+            dbname=database,
             user=user,
             password=password
         )
@@ -23,7 +23,7 @@ def test_connection(host, port, database, user, password):
         cur.close()
         conn.close()
         return True
-    except psycopg2.OperationalError as e:
+    except psycopg.OperationalError as e:
         print(f"[FAIL] Connection failed: {e}")
         return False
     except Exception as e:
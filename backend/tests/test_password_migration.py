@@ -0,0 +1,144 @@
+"""
+Password scheme migration: legacy SHA256 + bcrypt hashes keep verifying and
+are replaced with Argon2id on the next successful login.
+"""
+import binascii
+import hashlib
+
+import bcrypt
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers every mapper on Base)
+from app.core import security
+from app.core.database import Base
+from app.crud import crud_user
+from app.models.user import User
+
+PASSWORD = "correct horse battery staple"
+
+
+def _legacy_bcrypt_hash(password: str) -> str:
+    """A hash in the pre-Argon2 format: bcrypt over the hex SHA256 digest"""
+    prehashed = binascii.hexlify(hashlib.sha256(password.encode("utf-8")).digest())
+    return bcrypt.hashpw(prehashed, bcrypt.gensalt(rounds=4)).decode("ascii")
+
+
+@pytest.fixture(autouse=True)
+def _isolated_caches(monkeypatch):
+    # No Redis in tests, and no verification outcomes leaking between them
+    monkeypatch.setattr(crud_user, "redis_client", None)
+    security._password_cache.clear()
+    yield
+    security._password_cache.clear()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _add_user(db, **fields) -> User:
+    user = User(username=fields["email"].split("@")[0], **fields)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _stored_hash(db, user_id: int) -> str:
+    db.expire_all()
+    return db.get(User, user_id).hashed_password
+
+
+def test_legacy_bcrypt_hash_verifies():
+    legacy = _legacy_bcrypt_hash(PASSWORD)
+
+    assert security.verify_password(PASSWORD, legacy)
+    assert not security.verify_password("wrong", legacy)
+    assert security.password_needs_rehash(legacy)
+
+
+def test_new_hashes_are_argon2id():
+    hashed = security.get_password_hash(PASSWORD)
+
+    assert hashed.startswith("$argon2id$")
+    assert security.verify_password(PASSWORD, hashed)
+    assert not security.password_needs_rehash(hashed)
+
+
+def test_authenticate_upgrades_legacy_hash(db):
+    user = _add_user(db, email="legacy@example.com", hashed_password=_legacy_bcrypt_hash(PASSWORD))
+
+    authenticated = crud_user.user.authenticate(db, email="Legacy@Example.com", password=PASSWORD)
+
+    assert authenticated is not None and authenticated.id == user.id
+    assert authenticated.last_login is not None
+    stored = _stored_hash(db, user.id)
+    assert stored.startswith("$argon2id$")
+    assert security.verify_password(PASSWORD, stored)
+    # The upgraded hash is what the next login checks against
+    assert crud_user.user.authenticate(db, email="legacy@example.com", password=PASSWORD) is not None
+
+
+def test_wrong_password_on_legacy_hash_is_not_rehashed(db):
+    legacy = _legacy_bcrypt_hash(PASSWORD)
+    user = _add_user(db, email="legacy@example.com", hashed_password=legacy)
+
+    assert crud_user.user.authenticate(db, email="legacy@example.com", password="wrong") is None
+    # A repeat is answered from the negative cache and still fails
+    assert crud_user.user.authenticate(db, email="legacy@example.com", password="wrong") is None
+
+    stored = _stored_hash(db, user.id)
+    assert stored == legacy
+    assert db.get(User, user.id).last_login is None
+
+
+def test_cached_failure_does_not_block_correct_password(db):
+    user = _add_user(db, email="legacy@example.com", hashed_password=_legacy_bcrypt_hash(PASSWORD))
+
+    assert crud_user.user.authenticate(db, email="legacy@example.com", password="wrong") is None
+    assert crud_user.user.authenticate(db, email="legacy@example.com", password=PASSWORD) is not None
+    assert _stored_hash(db, user.id).startswith("$argon2id$")
+
+
+def test_unknown_email_checks_the_dummy_hash(db, monkeypatch):
+    checked = []
+    real_verify = crud_user.verify_password
+    monkeypatch.setattr(
+        crud_user, "verify_password",
+        lambda plain, hashed: checked.append(hashed) or real_verify(plain, hashed),
+    )
+
+    assert crud_user.user.authenticate(db, email="nobody@example.com", password=PASSWORD) is None
+    assert checked == [crud_user._dummy_password_hash()]
+
+
+@pytest.mark.parametrize("fields", [
+    # OAuth sign-ups store an empty hash
+    {"hashed_password": "", "is_oauth_account": True, "oauth_provider": "google"},
+    # Password accounts later linked to OAuth keep theirs but must use OAuth
+    {"hashed_password": _legacy_bcrypt_hash(PASSWORD), "is_oauth_account": True, "oauth_provider": "github"},
+])
+def test_oauth_account_checks_the_dummy_hash(db, monkeypatch, fields):
+    user = _add_user(db, email="oauth@example.com", **fields)
+    checked = []
+    real_verify = crud_user.verify_password
+    monkeypatch.setattr(
+        crud_user, "verify_password",
+        lambda plain, hashed: checked.append(hashed) or real_verify(plain, hashed),
+    )
+
+    assert crud_user.user.authenticate(db, email="oauth@example.com", password=PASSWORD) is None
+    assert checked == [crud_user._dummy_password_hash()]
+    assert _stored_hash(db, user.id) == fields["hashed_password"]